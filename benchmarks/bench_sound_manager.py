@@ -0,0 +1,186 @@
+"""Headless benchmarks of the SoundManager hot paths on an OpenAL Soft loopback device.
+
+    python benchmarks/bench_sound_manager.py --output bench.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from fighting_sound import openal
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.wave import pcm_cache
+
+SAMPLE_RATE = 48000
+
+
+def measure(func: Callable[[], None], calls: int, repeat: int) -> Dict[str, float]:
+    # seconds per call over `repeat` runs of `calls` calls each
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        timings.append((time.perf_counter() - start) / calls)
+    return {"best": min(timings), "median": statistics.median(timings)}
+
+
+def write_wave(file_path: Path, seconds: float, channels: int = 2) -> None:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    tone = (np.sin(2 * np.pi * 440 * t) * 16000).astype(np.int16)
+    with wave.open(str(file_path), "wb") as wavefp:
+        wavefp.setnchannels(channels)
+        wavefp.setsampwidth(2)
+        wavefp.setframerate(SAMPLE_RATE)
+        wavefp.writeframes(np.repeat(tone[:, None], channels, axis=1).tobytes())
+
+
+def create_manager() -> SoundManager:
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer(sample_rate=SAMPLE_RATE))
+    return sound_manager
+
+
+def bench_sample_audio(sound_manager: SoundManager, repeat: int) -> List[Dict]:
+    results = []
+    for render_size in (256, 800, 2048, 8192):
+        for reuse_buffer in (False, True):
+            timing = measure(lambda: sound_manager.sample_audio(render_size=render_size, reuse_buffer=reuse_buffer), 200, repeat)
+            results.append({
+                "name": "sample_audio",
+                "params": {"render_size": render_size, "reuse_buffer": reuse_buffer},
+                "seconds_per_call": timing,
+                "realtime_factor": render_size / SAMPLE_RATE / timing["best"],
+            })
+    timing = measure(lambda: sound_manager.sample_audio_batch(60, 800, reuse_buffer=True), 10, repeat)
+    results.append({
+        "name": "sample_audio_batch",
+        "params": {"n_frames": 60, "render_size": 800},
+        "seconds_per_call": timing,
+        "realtime_factor": 60 * 800 / SAMPLE_RATE / timing["best"],
+    })
+    return results
+
+
+def bench_play(sound_manager: SoundManager, buffer, repeat: int) -> List[Dict]:
+    results = []
+    for active in (0, 16, 64):
+        sources = [sound_manager.create_audio_source() for _ in range(active)]
+        for i, source in enumerate(sources):
+            sound_manager.play3d(source, buffer, float(i), 0.0, 0.0, True)
+        source = sound_manager.create_audio_source()
+        results.append({
+            "name": "play",
+            "params": {"active_sources": active},
+            "seconds_per_call": measure(lambda: sound_manager.play(source, buffer, 1.0, 2.0, False), 200, repeat),
+        })
+        results.append({
+            "name": "play3d",
+            "params": {"active_sources": active},
+            "seconds_per_call": measure(lambda: sound_manager.play3d(source, buffer, 1.0, 2.0, 3.0, False), 200, repeat),
+        })
+        for audio_source in sources + [source]:
+            sound_manager.stop(audio_source)
+            sound_manager.remove_source(audio_source)
+    return results
+
+
+def bench_set_source_pos3d(sound_manager: SoundManager, repeat: int) -> List[Dict]:
+    source = sound_manager.create_audio_source()
+    timing = measure(lambda: sound_manager.set_source_pos3d(source, 1.0, 2.0, 3.0), 1000, repeat)
+    sound_manager.remove_source(source)
+    return [{"name": "set_source_pos3d", "params": {}, "seconds_per_call": timing, "updates_per_second": 1 / timing["best"]}]
+
+
+def bench_create_audio_buffer(sound_manager: SoundManager, directory: Path, repeat: int) -> List[Dict]:
+    results = []
+    for seconds in (1, 10):
+        file_path = directory / f"tone_{seconds}s.wav"
+        write_wave(file_path, seconds)
+        megabytes = file_path.stat().st_size / 1024 / 1024
+
+        def load() -> None:
+            pcm_cache.clear()
+            sound_manager.create_audio_buffer(file_path)
+
+        timing = measure(load, 5, repeat)
+        results.append({
+            "name": "create_audio_buffer",
+            "params": {"megabytes": round(megabytes, 2)},
+            "seconds_per_call": timing,
+            "seconds_per_megabyte": timing["best"] / megabytes,
+        })
+    return results
+
+
+def bench_playback(sound_manager: SoundManager, repeat: int) -> List[Dict]:
+    # one 20 ms chunk queued per rendered 20 ms frame, as a TTS stream would
+    source = sound_manager.create_audio_source()
+    chunk = (np.sin(np.arange(960) / 10) * 16000).astype(np.int16).tobytes()
+
+    def stream() -> None:
+        sound_manager.playback(source, al.AL_FORMAT_MONO16, chunk, SAMPLE_RATE)
+        sound_manager.sample_audio(render_size=960, reuse_buffer=True)
+
+    render_only = measure(lambda: sound_manager.sample_audio(render_size=960, reuse_buffer=True), 200, repeat)
+    timing = measure(stream, 200, repeat)
+    sound_manager.stop_playback(source)
+    return [{
+        "name": "playback",
+        "params": {"chunk_ms": 20},
+        "seconds_per_call": timing,
+        "overhead_seconds_per_chunk": timing["best"] - render_only["best"],
+    }]
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the best and median are reported")
+    args = parser.parse_args(argv)
+
+    sound_manager = create_manager()
+    try:
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            results += bench_sample_audio(sound_manager, args.repeat)
+            results += bench_create_audio_buffer(sound_manager, Path(directory), args.repeat)
+            write_wave(Path(directory) / "effect.wav", 0.5)
+            buffer = sound_manager.create_audio_buffer(Path(directory) / "effect.wav")
+            results += bench_play(sound_manager, buffer, args.repeat)
+            results += bench_set_source_pos3d(sound_manager, args.repeat)
+            results += bench_playback(sound_manager, args.repeat)
+
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "openal": openal.get_dll_file(),
+                "sample_rate": SAMPLE_RATE,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if args.output:
+            args.output.write_text(output)
+        else:
+            print(output)
+    finally:
+        sound_manager.close()
+
+
+if __name__ == "__main__":
+    main()
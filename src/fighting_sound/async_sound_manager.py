@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from fighting_sound.models.audio_buffer import AudioBuffer
+from fighting_sound.models.audio_source import AudioSource
+from fighting_sound.openal import al
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.layout import LAYOUT_PLANAR
+
+
+class AsyncSoundManager:
+    # the SoundManager is created and only ever used on the audio thread, so OpenAL context affinity holds;
+    # calls submitted during one event loop iteration are run there as one batch
+    sound_manager: SoundManager
+
+    def __init__(self, factory: Callable[[], SoundManager]) -> None:
+        self.factory = factory
+        self.sound_manager = None
+        self.commands: List[Tuple[asyncio.Future, Callable, tuple, dict]] = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.flush_scheduled = False
+        self.running = False
+        self.thread = None
+
+    async def start(self) -> None:
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="AsyncSoundManager", daemon=True)
+        self.thread.start()
+        await self.submit(self.create_sound_manager)
+
+    def create_sound_manager(self) -> None:
+        self.sound_manager = self.factory()
+
+    def run(self) -> None:
+        while True:
+            self.wakeup.wait()
+            with self.lock:
+                self.wakeup.clear()
+                commands, self.commands = self.commands, []
+                running = self.running
+            results: Dict[asyncio.AbstractEventLoop, List[Tuple[asyncio.Future, Any, BaseException]]] = {}
+            for future, func, args, kwargs in commands:
+                result, error = None, None
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as exc:
+                    error = exc
+                results.setdefault(future.get_loop(), []).append((future, result, error))
+            # one hop back per event loop for the whole batch
+            for loop, batch in results.items():
+                loop.call_soon_threadsafe(self.resolve, batch)
+            if not running:
+                return
+
+    @staticmethod
+    def resolve(batch: List[Tuple[asyncio.Future, Any, BaseException]]) -> None:
+        for future, result, error in batch:
+            if future.cancelled():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def flush(self) -> None:
+        self.flush_scheduled = False
+        self.wakeup.set()
+
+    def submit(self, func: Callable, *args, **kwargs) -> asyncio.Future:
+        if not self.running:
+            raise RuntimeError("AsyncSoundManager not started")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.lock:
+            self.commands.append((future, func, args, kwargs))
+        if not self.flush_scheduled:
+            # wake the audio thread once the current loop iteration has queued everything
+            self.flush_scheduled = True
+            loop.call_soon(self.flush)
+        return future
+
+    def call(self, method: str, *args, **kwargs) -> asyncio.Future:
+        return self.submit(lambda: getattr(self.sound_manager, method)(*args, **kwargs))
+
+    async def create_audio_source(self, attrs: dict = {}) -> AudioSource:
+        return await self.call("create_audio_source", attrs)
+
+    async def create_audio_buffer(self, file_path=None) -> AudioBuffer:
+        return await self.call("create_audio_buffer", file_path)
+
+    async def play(self, source: AudioSource, buffer: AudioBuffer, x: float, y: float, loop: bool) -> None:
+        await self.call("play", source, buffer, x, y, loop)
+
+    async def play3d(self, source: AudioSource, buffer: AudioBuffer, x: float, y: float, z: float, loop: bool) -> None:
+        await self.call("play3d", source, buffer, x, y, z, loop)
+
+    async def stop(self, source: AudioSource) -> None:
+        await self.call("stop", source)
+
+    async def set_source_pos(self, source: AudioSource, x: float, y: float) -> None:
+        await self.call("set_source_pos", source, x, y)
+
+    async def set_source_gain(self, source: AudioSource, gain: float) -> None:
+        await self.call("set_source_gain", source, gain)
+
+    async def set_listener_position(self, x: float, y: float, z: float) -> None:
+        await self.call("set_listener_position", x, y, z)
+
+    async def playback(self, source: AudioSource, format: int, audio_sample: bytes, sample_rate: int) -> bool:
+        return await self.call("playback", source, format, audio_sample, sample_rate)
+
+    async def sample_audio(self, dtype: type = al.ALfloat, render_size: int = 800, nchannels: int = 2,
+                           layout: str = LAYOUT_PLANAR) -> np.ndarray:
+        return await self.call("sample_audio", dtype, render_size, nchannels, layout=layout)
+
+    async def frames(self, dtype: type = al.ALfloat, render_size: int = 800, nchannels: int = 2,
+                     layout: str = LAYOUT_PLANAR, interval: float = None) -> AsyncIterator[np.ndarray]:
+        # with interval the frames are paced in real time, otherwise as fast as they are consumed
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while self.running:
+            yield await self.sample_audio(dtype, render_size, nchannels, layout)
+            if interval is not None:
+                deadline += interval
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+    async def close(self) -> None:
+        if self.thread is None:
+            return
+        future = self.call("close")
+        with self.lock:
+            self.running = False
+        await future
+        self.thread.join()
+        self.thread = None
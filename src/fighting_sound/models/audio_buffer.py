@@ -1,8 +1,10 @@
+import os
 from pathlib import Path
 from typing import List
 
 from fighting_sound.openal import al, alc
-from fighting_sound.utils.wave import load_sound
+from fighting_sound.utils.openal import make_context_current
+from fighting_sound.utils.wave import MMAP_THRESHOLD, MappedSound, load_sound
 
 
 class AudioBuffer:
@@ -16,8 +18,20 @@ class AudioBuffer:
     def get_buffers(self) -> List[int]:
         return self.buffers
     
-    def register_sound(self, file_path: Path) -> None:
+    def register_sound(self, file_path: Path, use_mmap: bool = None) -> None:
+        if use_mmap is None:
+            use_mmap = os.path.getsize(file_path) >= MMAP_THRESHOLD
+        if use_mmap:
+            self.register_mapped_sound(file_path)
+            return
+        alformat, wavbuf, samplerate = load_sound(file_path)
         for i, buffer_id in enumerate(self.buffers):
-            alc.alcMakeContextCurrent(self.contexts[i])
-            alformat, wavbuf, samplerate = load_sound(file_path)
+            make_context_current(self.contexts[i])
             al.alBufferData(buffer_id, alformat, wavbuf, len(wavbuf), samplerate)
+
+    def register_mapped_sound(self, file_path: Path) -> None:
+        # alBufferData copies straight out of the page cache, the PCM never lands on the Python heap
+        with MappedSound(file_path) as sound:
+            for i, buffer_id in enumerate(self.buffers):
+                make_context_current(self.contexts[i])
+                al.alBufferData(buffer_id, sound.alformat, sound.pointer, sound.size, sound.samplerate)
@@ -1,6 +1,7 @@
 from typing import List
 
 from fighting_sound.openal import al, alc
+from fighting_sound.utils.openal import make_context_current
 
 
 class AudioSource:
@@ -16,5 +17,5 @@ class AudioSource:
     
     def clear_buffer(self) -> None:
         for i, source_id in enumerate(self.source_ids):
-            alc.alcMakeContextCurrent(self.contexts[i])
+            make_context_current(self.contexts[i])
             al.alSourcei(source_id, al.AL_BUFFER, al.AL_NONE)
@@ -0,0 +1,107 @@
+from typing import Dict, List
+
+from fighting_sound.models.audio_buffer import AudioBuffer
+from fighting_sound.models.audio_source import AudioSource
+
+STEAL_OLDEST = "oldest"
+STEAL_QUIETEST = "quietest"
+
+steal_policies = (STEAL_OLDEST, STEAL_QUIETEST)
+
+
+class AudioSourcePool:
+    sources: List[AudioSource]
+    steal_policy: str
+
+    def __init__(self, sound_manager, size: int = 32, steal_policy: str = STEAL_OLDEST) -> None:
+        if steal_policy not in steal_policies:
+            raise ValueError(f"Invalid steal policy: {steal_policy}")
+        self.sound_manager = sound_manager
+        self.steal_policy = steal_policy
+        self.sources = [sound_manager.create_audio_source() for _ in range(size)]
+        self.indices: Dict[int, int] = {id(source): i for i, source in enumerate(self.sources)}
+        self.free: List[int] = list(range(size - 1, -1, -1))
+        self.busy = [False] * size
+        self.started = [0] * size
+        self.gains = [1.0] * size
+        self.clock = 0
+        self.steal_count = 0
+
+    def acquire(self, gain: float = 1.0) -> AudioSource:
+        if not self.free:
+            self.reclaim()
+        if self.free:
+            i = self.free.pop()
+        else:
+            i = self.steal()
+        self.clock += 1
+        self.busy[i] = True
+        self.started[i] = self.clock
+        self.gains[i] = gain
+        return self.sources[i]
+
+    def release(self, source: AudioSource) -> None:
+        i = self.indices[id(source)]
+        if self.busy[i]:
+            self.busy[i] = False
+            self.free.append(i)
+
+    def play(self, buffer: AudioBuffer, x: float, y: float, loop: bool = False, gain: float = 1.0) -> AudioSource:
+        return self.play3d(buffer, x, 0, y, loop, gain)
+
+    def play3d(self, buffer: AudioBuffer, x: float, y: float, z: float, loop: bool = False, gain: float = 1.0) -> AudioSource:
+        source = self.acquire(gain)
+        self.sound_manager.set_source_gain(source, gain)
+        self.sound_manager.play3d(source, buffer, x, y, z, loop)
+        return source
+
+    def set_gain(self, source: AudioSource, gain: float) -> None:
+        # the quietest voice is picked from the gains set through the pool,
+        # a gain set directly with SoundManager.set_source_gain is not seen here
+        self.gains[self.indices[id(source)]] = gain
+        self.sound_manager.set_source_gain(source, gain)
+
+    def reclaim(self) -> int:
+        # one state query pass per renderer instead of one is_playing call per voice
+        busy = [i for i, in_use in enumerate(self.busy) if in_use]
+        if not busy:
+            return 0
+        playing = self.sound_manager.are_playing([self.sources[i] for i in busy])
+        reclaimed = 0
+        for i, is_playing in zip(busy, playing):
+            if not is_playing and not self.is_start_pending(self.sources[i]):
+                self.busy[i] = False
+                self.free.append(i)
+                reclaimed += 1
+        return reclaimed
+
+    def is_start_pending(self, source: AudioSource) -> bool:
+        # between begin_frame and commit_frame a play is only queued, OpenAL still reports the voice as stopped
+        if not self.sound_manager.deferred:
+            return False
+        action = self.sound_manager.frame_commands.source_actions.get(id(source))
+        return action is not None and action[1] is not None
+
+    def steal(self) -> int:
+        if self.steal_policy == STEAL_QUIETEST:
+            i = min(range(len(self.sources)), key=lambda j: (self.gains[j], self.started[j]))
+        else:
+            i = min(range(len(self.sources)), key=self.started.__getitem__)
+        self.sound_manager.stop(self.sources[i])
+        self.busy[i] = False
+        self.steal_count += 1
+        return i
+
+    def stop_all(self) -> None:
+        for i, in_use in enumerate(self.busy):
+            if in_use:
+                self.sound_manager.stop(self.sources[i])
+                self.busy[i] = False
+                self.free.append(i)
+
+    def close(self) -> None:
+        self.stop_all()
+        for source in self.sources:
+            self.sound_manager.remove_source(source)
+        self.sources = []
+        self.free = []
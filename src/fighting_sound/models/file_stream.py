@@ -0,0 +1,83 @@
+import queue
+import threading
+from pathlib import Path
+
+from fighting_sound.models.streaming_source import StreamingSource
+from fighting_sound.utils.wave import iter_sound_chunks, read_sound_format
+
+# queued by the decoder thread after the last chunk, compared by identity
+END_OF_STREAM = object()
+
+
+class FileStream:
+    stream: StreamingSource
+    file_path: Path
+    loop: bool
+    finished: bool
+    # exception that stopped the decoder thread, raised again by update()
+    error: Exception
+
+    def __init__(self, stream: StreamingSource, file_path: Path, chunk_ms: int = 100, queue_size: int = 4, loop: bool = False) -> None:
+        self.stream = stream
+        self.file_path = file_path
+        self.loop = loop
+        self.alformat, self.samplerate = read_sound_format(file_path)
+        self.chunk_frames = max(1, self.samplerate * chunk_ms // 1000)
+        # only queue_size decoded chunks are ever held in memory, plus the one waiting for a free buffer
+        self.chunks = queue.Queue(maxsize=queue_size)
+        self.pending = None
+        self.finished = False
+        self.error = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.decode, name=f"FileStream-{Path(file_path).name}", daemon=True)
+        self.thread.start()
+
+    def put(self, chunk: bytes) -> bool:
+        while not self.stop_event.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def decode(self) -> None:
+        # runs on the decoder thread, it never touches OpenAL
+        try:
+            while True:
+                for chunk in iter_sound_chunks(self.file_path, self.chunk_frames):
+                    if not self.put(chunk):
+                        return
+                if not self.loop:
+                    break
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.put(END_OF_STREAM)
+
+    def update(self) -> bool:
+        # called from the audio thread every tick; returns False once the whole file has been queued,
+        # or raises what stopped the decoder thread
+        if self.finished:
+            return False
+        while True:
+            if self.pending is None:
+                try:
+                    self.pending = self.chunks.get_nowait()
+                except queue.Empty:
+                    return True
+            if self.pending is END_OF_STREAM:
+                self.finished = True
+                if self.error is not None:
+                    raise self.error
+                return False
+            if self.stream.get_free_buffers() == 0:
+                return True
+            self.stream.queue(self.alformat, self.pending, self.samplerate)
+            self.pending = None
+
+    def close(self) -> None:
+        self.stop_event.set()
+        self.thread.join()
+        self.pending = None
+        self.finished = True
@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Tuple
+
+from fighting_sound.models.audio_buffer import AudioBuffer
+from fighting_sound.models.audio_source import AudioSource
+
+
+class FrameCommands:
+    # (id(source), attr) -> (source, attr, value), the last write of a frame wins
+    source_attributes: Dict[Tuple[int, int], Tuple[AudioSource, int, Any]]
+    listener_attributes: Dict[int, List[float]]
+    # id(source) -> (source, buffer, loop); buffer is None for a stop, the last play/stop of a frame wins
+    source_actions: Dict[int, Tuple[AudioSource, AudioBuffer, bool]]
+
+    def __init__(self) -> None:
+        self.source_attributes = {}
+        self.listener_attributes = {}
+        self.source_actions = {}
+
+    def set_source_attribute(self, source: AudioSource, attr: int, value: Any) -> None:
+        self.source_attributes[(id(source), attr)] = (source, attr, value)
+
+    def set_listener_attribute(self, attr: int, values: List[float]) -> None:
+        self.listener_attributes[attr] = values
+
+    def play(self, source: AudioSource, buffer: AudioBuffer, loop: bool) -> None:
+        self.source_actions[id(source)] = (source, buffer, loop)
+
+    def stop(self, source: AudioSource) -> None:
+        self.source_actions[id(source)] = (source, None, False)
+
+    def clear(self) -> None:
+        self.source_attributes.clear()
+        self.listener_attributes.clear()
+        self.source_actions.clear()
+
+    def __len__(self) -> int:
+        return len(self.source_attributes) + len(self.listener_attributes) + len(self.source_actions)
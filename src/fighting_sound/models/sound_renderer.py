@@ -1,20 +1,35 @@
-import ctypes
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 
 import numpy as np
 
+from fighting_sound.models.frame_commands import FrameCommands
 from fighting_sound.openal import al, alc, soft
 from fighting_sound.utils.dtype import dtype_map
-from fighting_sound.utils.openal import set_source_attribute
+from fighting_sound.utils.encoding import EncodingProfile
+from fighting_sound.utils.layout import LAYOUT_PLANAR, LAYOUT_PLANAR_CONTIGUOUS, deinterleave, layouts
+from fighting_sound.utils.openal import (get_context_key, is_thread_local_context_supported, make_context_current,
+                                         make_thread_context_current, release_context, set_source_attribute, thread_local_contexts)
 
 
 class SoundRenderer:
     device = None
     context = None
+    render_buffers: Dict[str, np.ndarray]
+    executor: ThreadPoolExecutor = None
+    # output format of a loopback renderer, None for a device renderer
+    format: int = None
+    channel: int = None
+    sample_rate: int = None
 
-    def __init__(self, device, context) -> None:
+    def __init__(self, device, context, format: int = None, channel: int = None, sample_rate: int = None) -> None:
         self.device = device
         self.context = context
+        self.render_buffers = {}
+        self.executor = None
+        self.format = format
+        self.channel = channel
+        self.sample_rate = sample_rate
 
     @staticmethod
     def create_default_renderer():
@@ -31,10 +46,39 @@ class SoundRenderer:
         ]
         attrs_c = (al.ALint * len(attrs))(*attrs)
         context = alc.alcCreateContext(device, attrs_c)
-        return SoundRenderer(device, context)
+        return SoundRenderer(device, context, format, channel, sample_rate)
+
+    @staticmethod
+    def create_virtual_renderer_for_profile(profile: EncodingProfile, sample_rate: int = 48000):
+        # renders straight in the sample type and channel layout of a profile's only consumer,
+        # so SoundManager.sample_audio_encoded has nothing left to convert or downmix
+        return SoundRenderer.create_virtual_renderer(profile.render_format, profile.render_channel, sample_rate)
 
     def set(self) -> None:
-        alc.alcMakeContextCurrent(self.context)
+        make_context_current(self.context)
+
+    def enable_thread_context(self) -> None:
+        # from now on every thread using this renderer binds the context with alcSetThreadContext
+        # instead of changing the process-wide current context
+        if not is_thread_local_context_supported(self.device):
+            raise RuntimeError("ALC_EXT_thread_local_context is not supported")
+        thread_local_contexts.add(get_context_key(self.context))
+
+    def start_thread(self) -> None:
+        self.enable_thread_context()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SoundRenderer", initializer=self.set)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if self.executor is None:
+            raise RuntimeError("Renderer thread not started")
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def stop_thread(self) -> None:
+        if self.executor is not None:
+            self.executor.submit(make_thread_context_current, None)
+            self.executor.shutdown(wait=True)
+            self.executor = None
 
     def create_source(self, attrs: dict) -> int:
         self.set()
@@ -50,11 +94,39 @@ class SoundRenderer:
         al.alGenBuffers(1, buffer)
         return buffer.value
 
+    def create_buffers(self, n: int) -> List[int]:
+        self.set()
+        buffers = (al.ALuint * n)()
+        al.alGenBuffers(n, buffers)
+        return list(buffers)
+
+    def buffer_data(self, buffer_ids: List[int], sounds: List[Tuple[int, Any, int, int]]) -> None:
+        # sounds are (alformat, bytes or data pointer, size, samplerate)
+        self.set()
+        for buffer_id, (alformat, data, size, samplerate) in zip(buffer_ids, sounds):
+            al.alBufferData(buffer_id, alformat, data, size, samplerate)
+
     def al_listener_fv(self, param: int, values: List[float]) -> None:
         self.set()
         values_arr = (al.ALfloat * len(values))(*values)
         al.alListenerfv(param, values_arr)
 
+    def set_sources_attribute(self, source_ids: np.ndarray, attr: int, values: np.ndarray) -> None:
+        # one row of values per source id: vectors go through alSource3f, float/int scalars through alSourcef/alSourcei
+        if not len(source_ids):
+            return
+        self.set()
+        source_ids = source_ids.tolist()
+        if values.ndim == 2:
+            for source_id, (x, y, z) in zip(source_ids, values.tolist()):
+                al.alSource3f(source_id, attr, x, y, z)
+        elif values.dtype.kind == 'f':
+            for source_id, value in zip(source_ids, values.tolist()):
+                al.alSourcef(source_id, attr, value)
+        else:
+            for source_id, value in zip(source_ids, values.tolist()):
+                al.alSourcei(source_id, attr, value)
+
     def play(self, source_id: int) -> None:
         self.set()
         al.alSourcePlay(source_id)
@@ -65,6 +137,15 @@ class SoundRenderer:
         al.alGetSourcei(source_id, al.AL_SOURCE_STATE, state)
         return state.value == al.AL_PLAYING
 
+    def get_source_states(self, source_ids: List[int]) -> List[int]:
+        self.set()
+        state = al.ALint(0)
+        states = [0] * len(source_ids)
+        for i, source_id in enumerate(source_ids):
+            al.alGetSourcei(source_id, al.AL_SOURCE_STATE, state)
+            states[i] = state.value
+        return states
+
     def stop(self, source_id: int) -> None:
         self.set()
         if self.is_playing(source_id):
@@ -79,6 +160,29 @@ class SoundRenderer:
         set_source_attribute(source_id, al.AL_LOOPING, al.AL_TRUE if loop else al.AL_FALSE)
         self.play(source_id)
 
+    def apply_frame_commands(self, index: int, commands: FrameCommands) -> None:
+        # index selects this renderer's ids in the AudioSource/AudioBuffer lists
+        self.set()
+        alc.alcSuspendContext(self.context)
+        for attr, values in commands.listener_attributes.items():
+            self.al_listener_fv(attr, values)
+        for source, attr, value in commands.source_attributes.values():
+            set_source_attribute(source.get_source_ids()[index], attr, value)
+        if commands.source_actions:
+            stop_ids = [source.get_source_ids()[index] for source, _, _ in commands.source_actions.values()]
+            al.alSourceStopv(len(stop_ids), (al.ALuint * len(stop_ids))(*stop_ids))
+            play_ids = []
+            for source, buffer, loop in commands.source_actions.values():
+                if buffer is None:
+                    continue
+                source_id = source.get_source_ids()[index]
+                al.alSourcei(source_id, al.AL_BUFFER, buffer.get_buffers()[index])
+                al.alSourcei(source_id, al.AL_LOOPING, al.AL_TRUE if loop else al.AL_FALSE)
+                play_ids.append(source_id)
+            if play_ids:
+                al.alSourcePlayv(len(play_ids), (al.ALuint * len(play_ids))(*play_ids))
+        alc.alcProcessContext(self.context)
+
     def delete_source(self, source_id: int) -> None:
         self.set()
         al.alDeleteSources(1, al.ALuint(source_id))
@@ -88,42 +192,75 @@ class SoundRenderer:
         al.alDeleteBuffers(1, al.ALuint(buffer_id))
 
     def close(self) -> None:
+        self.stop_thread()
         self.set()
         alc.alcDestroyContext(self.context)
+        release_context(self.context)
         alc.alcCloseDevice(self.device)
 
-    def sample_audio(self, dtype: type, render_size: int, nchannels: int) -> np.ndarray:
+    def get_render_buffer(self, dtype: type, size: int, name: str = "render") -> np.ndarray:
+        np_dtype = dtype_map[dtype]
+        buffer = self.render_buffers.get(name)
+        if buffer is None or buffer.dtype != np_dtype or buffer.size < size:
+            buffer = np.empty(size, dtype=np_dtype)
+            self.render_buffers[name] = buffer
+        return buffer[:size]
+
+    def render(self, dtype: type, shape: Tuple[int, ...], nchannels: int, out: np.ndarray = None, reuse_buffer: bool = False,
+               layout: str = LAYOUT_PLANAR) -> np.ndarray:
+        if layout not in layouts:
+            raise ValueError(f"Invalid layout: {layout}")
+        # out is the planar array for LAYOUT_PLANAR_CONTIGUOUS and the interleaved samples otherwise,
+        # the planar layout is then a view of out
+        nframes = int(np.prod(shape))
+        size = nframes * nchannels
+        interleaved_shape = shape + (nchannels,)
+        planar_shape = shape[:-1] + (nchannels, shape[-1])
+        result = None
+        if layout == LAYOUT_PLANAR_CONTIGUOUS:
+            # render into scratch memory, the transpose into the result is the only copy
+            samples = self.get_render_buffer(dtype, size)
+            if out is not None:
+                if out.dtype != dtype_map[dtype] or out.shape != planar_shape:
+                    raise ValueError(f"Output array must be {np.dtype(dtype_map[dtype])} with shape {planar_shape}")
+                result = out
+            elif reuse_buffer:
+                result = self.get_render_buffer(dtype, size, "planar").reshape(planar_shape)
+        elif out is not None:
+            if out.dtype != dtype_map[dtype] or out.shape != interleaved_shape or not out.flags.c_contiguous:
+                raise ValueError(f"Output array must be C-contiguous {np.dtype(dtype_map[dtype])} with interleaved shape {interleaved_shape}")
+            samples = out.reshape(-1)
+        elif reuse_buffer:
+            samples = self.get_render_buffer(dtype, size)
+        else:
+            samples = np.empty(size, dtype=dtype_map[dtype])
         self.set()
-        audio_sample_type = dtype * render_size * nchannels
-        audio_sample_ptr = ctypes.cast(audio_sample_type(), ctypes.c_void_p)
-        soft.alcRenderSamplesSOFT(self.device, audio_sample_ptr, al.ALsizei(render_size))
-        separated_channel_audio = np.zeros((nchannels, render_size), dtype=dtype_map[dtype])
-        separated_channel_audio[:, :] = ctypes.cast(audio_sample_ptr, ctypes.POINTER(audio_sample_type)).contents
-        return separated_channel_audio
-    
+        soft.alcRenderSamplesSOFT(self.device, samples.ctypes.data, al.ALsizei(nframes))
+        return deinterleave(samples.reshape(interleaved_shape), layout, result)
+
+    def sample_audio(self, dtype: type, render_size: int, nchannels: int, out: np.ndarray = None, reuse_buffer: bool = False,
+                     layout: str = LAYOUT_PLANAR) -> np.ndarray:
+        return self.render(dtype, (render_size,), nchannels, out, reuse_buffer, layout)
+
+    def sample_audio_batch(self, dtype: type, n_frames: int, render_size: int, nchannels: int, out: np.ndarray = None,
+                           reuse_buffer: bool = False, layout: str = LAYOUT_PLANAR) -> np.ndarray:
+        return self.render(dtype, (n_frames, render_size), nchannels, out, reuse_buffer, layout)
+
     def get_processed_buffers(self, source_id: int) -> int:
         self.set()
         processed_buffers = al.ALint(0)
         al.alGetSourcei(source_id, al.AL_BUFFERS_PROCESSED, processed_buffers)
         return processed_buffers.value
     
-    def playback(self, source_id: int, format: int, audio_sample: bytes, sample_rate: int) -> None:
-        self.set()
-        buffer = al.ALuint(0)
-        if self.get_processed_buffers(source_id) > 0:
-            al.alSourceUnqueueBuffers(source_id, 1, buffer)
-        else:
-            al.alGenBuffers(1, buffer)
-        al.alBufferData(buffer, format, audio_sample, len(audio_sample), sample_rate)
-        al.alSourceQueueBuffers(source_id, 1, buffer)
-        if not self.is_playing(source_id):
-            self.play(source_id)
+    def unqueue_processed_buffers(self, source_id: int) -> List[int]:
+        processed = self.get_processed_buffers(source_id)
+        if processed == 0:
+            return []
+        buffers = (al.ALuint * processed)()
+        al.alSourceUnqueueBuffers(source_id, processed, buffers)
+        return list(buffers)
 
-    def stop_playback(self, source_id: int) -> None:
+    def queue_buffer(self, source_id: int, buffer_id: int, format: int, audio_sample: bytes, sample_rate: int) -> None:
         self.set()
-        buffer = al.ALuint(0)
-        for _ in range(self.get_processed_buffers(source_id)):
-            al.alSourceUnqueueBuffers(source_id, 1, buffer)
-            al.alDeleteBuffers(1, buffer)
-        self.stop(source_id)
-        self.al_source_i(source_id, al.AL_BUFFER, al.AL_NONE)
+        al.alBufferData(buffer_id, format, audio_sample, len(audio_sample), sample_rate)
+        al.alSourceQueueBuffers(source_id, 1, al.ALuint(buffer_id))
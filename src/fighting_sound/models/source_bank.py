@@ -0,0 +1,75 @@
+from typing import List
+
+import numpy as np
+
+from fighting_sound.models.audio_source import AudioSource
+from fighting_sound.openal import al
+
+
+class SourceBank:
+    sources: List[AudioSource]
+    positions: np.ndarray
+    gains: np.ndarray
+    pitches: np.ndarray
+    loops: np.ndarray
+
+    def __init__(self, sound_manager, size: int) -> None:
+        self.sound_manager = sound_manager
+        self.sources = [sound_manager.create_audio_source() for _ in range(size)]
+        # (renderers, size) source ids, row i belongs to sound_manager.sound_renderers[i]
+        self.source_ids = np.array([source.get_source_ids() for source in self.sources],
+                                   dtype=np.uint32).reshape((size, len(sound_manager.sound_renderers))).T
+        # OpenAL defaults, so the first commit only sends what was actually set
+        self.positions = np.zeros((size, 3), dtype=np.float32)
+        self.gains = np.ones(size, dtype=np.float32)
+        self.pitches = np.ones(size, dtype=np.float32)
+        self.loops = np.zeros(size, dtype=bool)
+        self.committed_positions = self.positions.copy()
+        self.committed_gains = self.gains.copy()
+        self.committed_pitches = self.pitches.copy()
+        self.committed_loops = self.loops.copy()
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def get_source(self, index: int) -> AudioSource:
+        return self.sources[index]
+
+    def set_positions(self, ids, xyz: np.ndarray) -> None:
+        self.positions[ids] = xyz
+
+    def set_gains(self, ids, gains: np.ndarray) -> None:
+        self.gains[ids] = gains
+
+    def set_pitches(self, ids, pitches: np.ndarray) -> None:
+        self.pitches[ids] = pitches
+
+    def set_loops(self, ids, loops: np.ndarray) -> None:
+        self.loops[ids] = loops
+
+    def commit(self) -> int:
+        # diff against the last committed state and push only the changed rows
+        changed_positions = np.flatnonzero(np.any(self.positions != self.committed_positions, axis=1))
+        changed_gains = np.flatnonzero(self.gains != self.committed_gains)
+        changed_pitches = np.flatnonzero(self.pitches != self.committed_pitches)
+        changed_loops = np.flatnonzero(self.loops != self.committed_loops)
+        changes = len(changed_positions) + len(changed_gains) + len(changed_pitches) + len(changed_loops)
+        if not changes:
+            return 0
+        loops = np.where(self.loops[changed_loops], al.AL_TRUE, al.AL_FALSE)
+        for i, sound_renderer in enumerate(self.sound_manager.sound_renderers):
+            source_ids = self.source_ids[i]
+            sound_renderer.set_sources_attribute(source_ids[changed_positions], al.AL_POSITION, self.positions[changed_positions])
+            sound_renderer.set_sources_attribute(source_ids[changed_gains], al.AL_GAIN, self.gains[changed_gains])
+            sound_renderer.set_sources_attribute(source_ids[changed_pitches], al.AL_PITCH, self.pitches[changed_pitches])
+            sound_renderer.set_sources_attribute(source_ids[changed_loops], al.AL_LOOPING, loops)
+        self.committed_positions[changed_positions] = self.positions[changed_positions]
+        self.committed_gains[changed_gains] = self.gains[changed_gains]
+        self.committed_pitches[changed_pitches] = self.pitches[changed_pitches]
+        self.committed_loops[changed_loops] = self.loops[changed_loops]
+        return changes
+
+    def close(self) -> None:
+        for source in self.sources:
+            self.sound_manager.remove_source(source)
+        self.sources = []
@@ -0,0 +1,92 @@
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from fighting_sound.models.audio_source import AudioSource
+from fighting_sound.utils.wave import format_frame_sizes
+
+
+class StreamingSource:
+    source: AudioSource
+    num_buffers: int
+    underruns: int
+    dropped: int
+
+    def __init__(self, sound_renderers: List, source: AudioSource, num_buffers: int = 8) -> None:
+        self.sound_renderers = list(sound_renderers)
+        self.source = source
+        self.num_buffers = num_buffers
+        # fixed ring per renderer: every buffer is either free or queued on the source
+        self.buffer_ids = [sound_renderer.create_buffers(num_buffers) for sound_renderer in self.sound_renderers]
+        self.free: List[List[int]] = [list(buffer_ids) for buffer_ids in self.buffer_ids]
+        # queued (buffer id, seconds) in queue order
+        self.queued: List[Deque[Tuple[int, float]]] = [deque() for _ in self.sound_renderers]
+        self.started = [False] * len(self.sound_renderers)
+        self.underruns = 0
+        self.dropped = 0
+
+    def reclaim(self, i: int) -> int:
+        source_id = self.source.get_source_ids()[i]
+        processed = self.sound_renderers[i].unqueue_processed_buffers(source_id)
+        for _ in processed:
+            buffer_id, _ = self.queued[i].popleft()
+            self.free[i].append(buffer_id)
+        return len(processed)
+
+    def get_free_buffers(self) -> int:
+        # number of chunks that can be queued right now on every renderer
+        for i in range(len(self.sound_renderers)):
+            self.reclaim(i)
+        return min((len(free) for free in self.free), default=0)
+
+    def queue(self, format: int, audio_sample: bytes, sample_rate: int) -> bool:
+        # returns False when a renderer had no free buffer and dropped the chunk
+        frame_size = format_frame_sizes.get(format)
+        if frame_size is None:
+            raise ValueError(f"Unsupported streaming buffer format: {format:#x}")
+        seconds = len(audio_sample) / frame_size / sample_rate
+        queued_all = True
+        for i, sound_renderer in enumerate(self.sound_renderers):
+            source_id = self.source.get_source_ids()[i]
+            self.reclaim(i)
+            if not self.free[i]:
+                self.dropped += 1
+                queued_all = False
+                continue
+            buffer_id = self.free[i].pop()
+            sound_renderer.queue_buffer(source_id, buffer_id, format, audio_sample, sample_rate)
+            self.queued[i].append((buffer_id, seconds))
+            if not sound_renderer.is_playing(source_id):
+                if self.started[i]:
+                    # the queue ran dry before this chunk arrived
+                    self.underruns += 1
+                sound_renderer.play(source_id)
+                self.started[i] = True
+        return queued_all
+
+    def get_queued_seconds(self) -> float:
+        # upper bound of the latency added by the queue, the head buffer is partly played already
+        return max((sum(seconds for _, seconds in queued) for queued in self.queued), default=0.0)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "num_buffers": self.num_buffers,
+            "queued_buffers": max((len(queued) for queued in self.queued), default=0),
+            "queued_seconds": self.get_queued_seconds(),
+            "underruns": self.underruns,
+            "dropped": self.dropped,
+        }
+
+    def stop(self) -> None:
+        for i, sound_renderer in enumerate(self.sound_renderers):
+            source_id = self.source.get_source_ids()[i]
+            sound_renderer.stop(source_id)
+            self.reclaim(i)
+            self.started[i] = False
+        self.source.clear_buffer()
+
+    def close(self) -> None:
+        self.stop()
+        for sound_renderer, buffer_ids in zip(self.sound_renderers, self.buffer_ids):
+            for buffer_id in buffer_ids:
+                sound_renderer.delete_buffer(buffer_id)
+        self.free = [[] for _ in self.sound_renderers]
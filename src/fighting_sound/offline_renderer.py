@@ -0,0 +1,162 @@
+import wave
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from fighting_sound.models.audio_source import AudioSource
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al, soft
+from fighting_sound.openal.log import logger
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.dtype import channel_format_map
+from fighting_sound.utils.events import (EVENT_GAIN, EVENT_LISTENER_ORIENTATION, EVENT_LISTENER_POSITION, EVENT_LISTENER_VELOCITY,
+                                         EVENT_PITCH, EVENT_PLAY, EVENT_PLAYBACK, EVENT_POSITION, EVENT_STOP)
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED
+
+
+class WaveSink:
+    # 16-bit PCM WAV file, written block by block
+    dtype = al.ALshort
+
+    def __init__(self, file_path: Path, nchannels: int, sample_rate: int, block_size: int) -> None:
+        self.wavefp = wave.open(str(file_path), "wb")
+        self.wavefp.setnchannels(nchannels)
+        self.wavefp.setsampwidth(2)
+        self.wavefp.setframerate(sample_rate)
+        self.block = np.empty((block_size, nchannels), dtype=np.int16)
+
+    def get_block(self, start: int, size: int) -> np.ndarray:
+        return self.block[:size]
+
+    def commit(self, start: int, size: int) -> None:
+        self.wavefp.writeframes(self.block[:size])
+
+    def close(self) -> None:
+        self.wavefp.close()
+
+
+class MemmapSink:
+    # float32 (samples, nchannels) np.memmap, rendered into in place
+    dtype = al.ALfloat
+
+    def __init__(self, file_path: Path, nchannels: int, total_samples: int) -> None:
+        self.memmap = np.memmap(file_path, dtype=np.float32, mode="w+", shape=(total_samples, nchannels))
+
+    def get_block(self, start: int, size: int) -> np.ndarray:
+        return self.memmap[start:start + size]
+
+    def commit(self, start: int, size: int) -> None:
+        pass
+
+    def close(self) -> None:
+        self.memmap.flush()
+        self.memmap = None
+
+
+sink_formats = {
+    al.ALshort: soft.ALC_SHORT_SOFT,
+    al.ALfloat: soft.ALC_FLOAT_SOFT,
+}
+
+
+class OfflineRenderer:
+    # replays an event log (utils.events) on a loopback renderer as fast as the CPU allows; rendering is
+    # split exactly at event sample offsets and streamed to the sink in blocks of at most block_size samples
+    sound_names: List[str]
+    sample_rate: int
+    nchannels: int
+    block_size: int
+
+    def __init__(self, sounds: Path, sound_names: List[str], sample_rate: int = 48000, nchannels: int = 2, block_size: int = 48000) -> None:
+        if nchannels not in channel_format_map:
+            raise ValueError(f"Invalid number of channels: {nchannels}")
+        self.sounds = sounds
+        self.sound_names = sound_names
+        self.sample_rate = sample_rate
+        self.nchannels = nchannels
+        self.block_size = block_size
+
+    def render_to_wave(self, events: np.ndarray, total_samples: int, file_path: Path, payload: bytes = b"") -> None:
+        self.render(events, total_samples, WaveSink(file_path, self.nchannels, self.sample_rate, self.block_size), payload)
+
+    def render_to_memmap(self, events: np.ndarray, total_samples: int, file_path: Path, payload: bytes = b"") -> np.memmap:
+        self.render(events, total_samples, MemmapSink(file_path, self.nchannels, total_samples), payload)
+        return np.memmap(file_path, dtype=np.float32, mode="r", shape=(total_samples, self.nchannels))
+
+    def create_sound_manager(self, dtype: type) -> SoundManager:
+        sound_manager = SoundManager()
+        try:
+            sound_manager.set_virtual_renderer(
+                SoundRenderer.create_virtual_renderer(sink_formats[dtype], channel_format_map[self.nchannels], self.sample_rate))
+            sound_manager.load_sounds(self.sounds)
+        except Exception:
+            sound_manager.close()
+            raise
+        return sound_manager
+
+    def render(self, events: np.ndarray, total_samples: int, sink, payload: bytes = b"") -> None:
+        sound_manager = self.create_sound_manager(sink.dtype)
+        sources: Dict[int, AudioSource] = {}
+        n_events = len(events)
+        i = 0
+        position = 0
+        try:
+            while position < total_samples:
+                while i < n_events and events[i]["sample"] <= position:
+                    self.apply_event(sound_manager, sources, events[i], payload)
+                    i += 1
+                end = min(total_samples, position + self.block_size)
+                if i < n_events:
+                    end = min(end, int(events[i]["sample"]))
+                size = end - position
+                block = sink.get_block(position, size)
+                sound_manager.sample_audio(sink.dtype, size, self.nchannels, out=block, layout=LAYOUT_INTERLEAVED)
+                sink.commit(position, size)
+                position = end
+        finally:
+            try:
+                sink.close()
+            finally:
+                self.close_sound_manager(sound_manager)
+
+    def close_sound_manager(self, sound_manager: SoundManager) -> None:
+        # the output is complete by now, tearing down the throwaway manager must not fail the render
+        try:
+            sound_manager.close()
+        except Exception:
+            logger.exception("Closing the offline renderer's sound manager failed")
+
+    def apply_event(self, sound_manager: SoundManager, sources: Dict[int, AudioSource], event: np.void, payload: bytes) -> None:
+        op = event["op"]
+        values = event["values"].tolist()
+        if op == EVENT_LISTENER_POSITION:
+            sound_manager.set_listener_position(*values[:3])
+            return
+        if op == EVENT_LISTENER_VELOCITY:
+            sound_manager.set_listener_velocity(*values[:3])
+            return
+        if op == EVENT_LISTENER_ORIENTATION:
+            sound_manager.set_listener_orientation(*values)
+            return
+        handle = int(event["source"])
+        source = sources.get(handle)
+        if source is None:
+            source = sources[handle] = sound_manager.create_audio_source()
+        if op == EVENT_PLAY:
+            buffer = sound_manager.get_sound_buffer(self.sound_names[event["buffer"]])
+            sound_manager.play3d(source, buffer, *values[:3], bool(event["flag"]))
+        elif op == EVENT_STOP:
+            sound_manager.stop(source)
+        elif op == EVENT_POSITION:
+            sound_manager.set_source_pos3d(source, *values[:3])
+        elif op == EVENT_GAIN:
+            sound_manager.set_source_gain(source, values[0])
+        elif op == EVENT_PITCH:
+            sound_manager.set_source_pitch(source, values[0])
+        elif op == EVENT_PLAYBACK:
+            offset = int(event["offset"])
+            audio_sample = bytes(payload[offset:offset + int(event["length"])])
+            sound_manager.playback(source, int(event["buffer"]), audio_sample, int(event["rate"]))
+        else:
+            raise ValueError(f"Invalid event: {op}")
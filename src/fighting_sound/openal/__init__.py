@@ -2,14 +2,26 @@
 import ctypes
 import os
 import sys
+import time
 import warnings
 from ctypes.util import find_library
 
-__all__ = ["get_dll_file", "version_info"]
+from .log import logger
 
+__all__ = ["get_dll_file", "set_dll_path", "version_info",
+           "enable_profiling", "disable_profiling", "get_call_stats",
+           "reset_call_stats"]
 
-def _findlib(libnames, path=None):
-    """Internal helper function to find the requested DLL(s)."""
+
+def _findlib(libnames, path=None, search_path=None):
+    """Internal helper function to find the requested DLL(s).
+
+    An explicit path is either the library file itself or a directory and
+    skips find_library. Otherwise search_path is looked at before
+    find_library.
+    """
+    if path and os.path.isfile(path):
+        return [path]
     platform = sys.platform
     if platform in ("win32", "cli"):
         suffix = ".dll"
@@ -28,11 +40,14 @@ def _findlib(libnames, path=None):
             platform = "DEFAULT"
         searchfor = libnames[platform]
     results = []
-    if path:
+    directory = path or search_path
+    if directory:
         for libname in searchfor:
-            dllfile = os.path.join(path, "%s%s" % (libname, suffix))
+            dllfile = os.path.join(directory, "%s%s" % (libname, suffix))
             if os.path.exists(dllfile):
                 results.append(dllfile)
+    if path:
+        return results
     for libname in searchfor:
         dllfile = find_library(libname)
         if dllfile:
@@ -40,15 +55,54 @@ def _findlib(libnames, path=None):
     return results
 
 
+class _LazyFunction(object):
+    """Placeholder for a library function; the first call opens the
+    library, binds the function and puts it in place of the placeholder in
+    its module."""
+    __slots__ = ("_dll", "_funcname", "_args", "_returns", "_func")
+
+    def __init__(self, dll, funcname, args, returns):
+        self._dll = dll
+        self._funcname = funcname
+        self._args = args
+        self._returns = returns
+        self._func = None
+
+    def __call__(self, *args):
+        func = self._func
+        if func is None:
+            func = self._func = self._dll._bind_placeholder(self)
+        return func(*args)
+
+    def __repr__(self):
+        return "<unbound %s>" % self._funcname
+
+
 class _DLL(object):
     """Function wrapper around the different DLL functions. Do not use or
     instantiate this one directly from your user code.
+
+    The library is only searched for and opened once the first function is
+    called, so importing the bindings for their data types and constants
+    stays cheap.
     """
-    def __init__(self, libinfo, libnames, path=None):
+    def __init__(self, libinfo, libnames, path=None, profiling=False):
         self._dll = None
-        foundlibs = _findlib(libnames, path)
+        self._libinfo = libinfo
+        self._libnames = libnames
+        self._path = path
+        self._functions = {}
+        self._missing = set()
+        self._call_stats = {}
+        self._profiling = profiling
+
+    def _load(self):
+        """Opens the library on first use."""
+        if self._dll is not None:
+            return self._dll
+        foundlibs = _findlib(self._libnames, self._path, os.getcwd())
         if len(foundlibs) == 0:
-            raise RuntimeError("could not find any library for %s" % libinfo)
+            raise RuntimeError("could not find any library for %s" % self._libinfo)
         for libfile in foundlibs:
             try:
                 self._dll = ctypes.CDLL(libfile)
@@ -60,26 +114,118 @@ class _DLL(object):
                 warnings.warn(exc, ImportWarning)
                 raise
         if self._dll is None:
-            raise RuntimeError("could not load any library for %s" % libinfo)
-        if path is not None and sys.platform in ("win32", "cli") and \
-            path in self._libfile:
-            os.environ["PATH"] += ";%s" % path
+            raise RuntimeError("could not load any library for %s" % self._libinfo)
+        if self._path is not None and sys.platform in ("win32", "cli") and \
+            self._path in self._libfile:
+            os.environ["PATH"] += ";%s" % self._path
+        return self._dll
+
+    def set_path(self, path):
+        """Sets the library file or directory to load instead of searching
+        for it. Raises RuntimeError once the library is loaded."""
+        if self._dll is not None:
+            raise RuntimeError("%s library already loaded from %s" % (self._libinfo, self._libfile))
+        self._path = path
 
     def bind_function(self, funcname, args=None, returns=None):
         """Binds the passed argument and return value types to the specified
-        function."""
-        func = getattr(self._dll, funcname)
+        function.
+
+        A placeholder is returned, the function is looked up in the library
+        on its first call. If profiling is enabled by then, a wrapper
+        counting the calls and the time spent in the function is used.
+        """
+        return _LazyFunction(self, funcname, args, returns)
+
+    def bind_optional(self, module, funcname, functions, warning):
+        """Binds one of the optional extension functions of a module on
+        first access, meant for a module level __getattr__.
+
+        functions maps the function names to their (args, returns). Raises
+        AttributeError if the library does not export the function, so
+        hasattr() tells whether the extension is available.
+        """
+        if funcname not in functions or funcname in self._missing:
+            raise AttributeError("module %r has no attribute %r" % (module.__name__, funcname))
+        args, returns = functions[funcname]
+        try:
+            func = self._bind(funcname, args, returns)
+        except AttributeError:
+            self._missing.add(funcname)
+            logger.warning(warning)
+            raise
+        setattr(module, funcname, func)
+        return func
+
+    def _bind(self, funcname, args, returns):
+        func = getattr(self._load(), funcname)
         func.argtypes = args
         func.restype = returns
+        self._functions[funcname] = func
+        if self._profiling:
+            return self._profiled(funcname, func)
         return func
 
+    def _bind_placeholder(self, placeholder):
+        """Binds the function behind a placeholder and replaces the
+        placeholder in the bound modules."""
+        func = self._bind(placeholder._funcname, placeholder._args, placeholder._returns)
+        for module in _bound_modules():
+            if vars(module).get(placeholder._funcname) is placeholder:
+                setattr(module, placeholder._funcname, func)
+        return func
+
+    def _profiled(self, funcname, func):
+        """Wraps a bound function to accumulate [calls, seconds] in the
+        call statistics."""
+        stats = self._call_stats.setdefault(funcname, [0, 0.0])
+        perf_counter = time.perf_counter
+
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter() - start
+        wrapper.__name__ = funcname
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def set_profiling(self, enabled, modules):
+        """Swaps the bound functions in the passed modules for profiling
+        wrappers or back to the plain ctypes functions."""
+        self._profiling = enabled
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                func = self._functions.get(name)
+                if func is None:
+                    continue
+                if enabled and value is func:
+                    setattr(module, name, self._profiled(name, func))
+                elif not enabled and value is not func:
+                    setattr(module, name, func)
+
+    @property
+    def profiling(self):
+        """Whether bound functions are wrapped for profiling."""
+        return self._profiling
+
+    @property
+    def call_stats(self):
+        """Gets the accumulated [calls, seconds] per function name."""
+        return self._call_stats
+
     @property
     def libfile(self):
-        """Gets the filename of the loaded library."""
+        """Gets the filename of the loaded library, loading it if needed."""
+        self._load()
         return self._libfile
 
 
-dll = _DLL("OpenAL", {"win32": ["OpenAL", "OpenAL32"], "darwin": ["OpenAL"], "DEFAULT": ["openal", "OpenAL"]}, getattr(os.getenv, "PYAL_DLL_PATH", os.getcwd()))
+# PYAL_DLL_PATH may name the library file or the directory holding it
+dll = _DLL("OpenAL", {"win32": ["OpenAL", "OpenAL32"], "darwin": ["OpenAL"], "DEFAULT": ["openal", "OpenAL"]}, os.getenv("PYAL_DLL_PATH"),
+           profiling=bool(os.getenv("PYAL_PROFILE")))
 
 
 def get_dll_file():
@@ -87,14 +233,52 @@ def get_dll_file():
     return dll.libfile
 
 
+def set_dll_path(path):
+    """Loads OpenAL from the passed library file or directory instead of
+    searching for it. Must be called before the first OpenAL call."""
+    dll.set_path(path)
+
+
+def _bound_modules():
+    from . import al, alc, soft
+    return al, alc, soft
+
+
+def enable_profiling():
+    """Counts calls and wall time of every AL/ALC function.
+
+    Functions are swapped for wrappers only while profiling is enabled, so
+    there is no overhead otherwise. Setting the PYAL_PROFILE environment
+    variable enables profiling from import on.
+    """
+    dll.set_profiling(True, _bound_modules())
+
+
+def disable_profiling():
+    """Restores the plain ctypes functions."""
+    dll.set_profiling(False, _bound_modules())
+
+
+def get_call_stats():
+    """Gets a snapshot of {function name: (calls, seconds)}."""
+    return {name: (calls, seconds) for name, (calls, seconds) in dll.call_stats.items() if calls}
+
+
+def reset_call_stats():
+    """Resets all call counters and timings to zero."""
+    for stats in dll.call_stats.values():
+        stats[0] = 0
+        stats[1] = 0.0
+
+
 def is_openal_soft():
     """Returns True if openAL-soft features are available."""
-    from . import alc
+    from . import soft
     expected = (
         'alcResetDeviceSOFT',
         'alcGetStringiSOFT',
     )
-    return all(getattr(alc, key, None) is not None for key in expected)
+    return all(getattr(soft, key, None) is not None for key in expected)
 
 
 __version__ = "0.2.0"
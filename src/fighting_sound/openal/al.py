@@ -12,6 +12,12 @@ __all__ = ["AL_INVALID", "AL_NONE", "AL_TRUE", "AL_FALSE",
            "AL_SAMPLE_OFFSET", "AL_BYTE_OFFSET", "AL_SOURCE_TYPE",
            "AL_STATIC", "AL_STREAMING", "AL_UNDETERMINED", "AL_FORMAT_MONO8",
            "AL_FORMAT_MONO16", "AL_FORMAT_STEREO8", "AL_FORMAT_STEREO16",
+           "AL_FORMAT_MONO_FLOAT32", "AL_FORMAT_STEREO_FLOAT32",
+           "AL_FORMAT_MONO_DOUBLE_EXT", "AL_FORMAT_STEREO_DOUBLE_EXT",
+           "AL_FORMAT_QUAD8", "AL_FORMAT_QUAD16", "AL_FORMAT_QUAD32",
+           "AL_FORMAT_51CHN8", "AL_FORMAT_51CHN16", "AL_FORMAT_51CHN32",
+           "AL_FORMAT_61CHN8", "AL_FORMAT_61CHN16", "AL_FORMAT_61CHN32",
+           "AL_FORMAT_71CHN8", "AL_FORMAT_71CHN16", "AL_FORMAT_71CHN32",
            "AL_REFERENCE_DISTANCE", "AL_ROLLOFF_FACTOR", "AL_CONE_OUTER_GAIN",
            "AL_MAX_DISTANCE", "AL_FREQUENCY", "AL_BITS", "AL_CHANNELS",
            "AL_SIZE", "AL_UNUSED", "AL_PENDING", "AL_PROCESSED", "AL_NO_ERROR",
@@ -93,6 +99,26 @@ AL_FORMAT_MONO16 = 0x1101
 AL_FORMAT_STEREO8 = 0x1102
 AL_FORMAT_STEREO16 = 0x1103
 
+# AL_EXT_float32, AL_EXT_double
+AL_FORMAT_MONO_FLOAT32 = 0x10010
+AL_FORMAT_STEREO_FLOAT32 = 0x10011
+AL_FORMAT_MONO_DOUBLE_EXT = 0x10012
+AL_FORMAT_STEREO_DOUBLE_EXT = 0x10013
+
+# AL_EXT_MCFORMATS, the 32 bit formats are float
+AL_FORMAT_QUAD8 = 0x1204
+AL_FORMAT_QUAD16 = 0x1205
+AL_FORMAT_QUAD32 = 0x1206
+AL_FORMAT_51CHN8 = 0x120A
+AL_FORMAT_51CHN16 = 0x120B
+AL_FORMAT_51CHN32 = 0x120C
+AL_FORMAT_61CHN8 = 0x120D
+AL_FORMAT_61CHN16 = 0x120E
+AL_FORMAT_61CHN32 = 0x120F
+AL_FORMAT_71CHN8 = 0x1210
+AL_FORMAT_71CHN16 = 0x1211
+AL_FORMAT_71CHN32 = 0x1212
+
 AL_REFERENCE_DISTANCE = 0x1020
 AL_ROLLOFF_FACTOR = 0x1021
 AL_CONE_OUTER_GAIN = 0x1022
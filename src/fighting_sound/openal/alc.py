@@ -1,4 +1,5 @@
 import ctypes
+import sys
 
 from . import dll
 
@@ -150,3 +151,14 @@ alcCaptureStop = _bind("alcCaptureStop", [ctypes.POINTER(ALCdevice)])
 alcCaptureSamples = _bind("alcCaptureSamples", [ctypes.POINTER(ALCdevice),
                                                 ctypes.POINTER(ALCvoid),
                                                 ALCsizei])
+
+# ALC_EXT_thread_local_context, bound on first access through __getattr__
+_optional = {
+    "alcSetThreadContext": ([ctypes.POINTER(ALCcontext)], ALCboolean),
+    "alcGetThreadContext": (None, ctypes.POINTER(ALCcontext)),
+}
+
+
+def __getattr__(name):
+    return dll.bind_optional(sys.modules[__name__], name, _optional,
+                             "ALC_EXT_thread_local_context functions could not be bound")
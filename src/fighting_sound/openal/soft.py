@@ -1,13 +1,11 @@
 import ctypes
+import sys
 
 from . import dll
 from .alc import ALCchar, ALCdevice, ALCenum, ALCint, ALCsizei, ALCvoid
-from .log import logger
 
 __all__ = []
 
-_bind = dll.bind_function
-
 ALC_BYTE_SOFT = 0x1400
 ALC_UNSIGNED_BYTE_SOFT = 0x1401
 ALC_SHORT_SOFT = 0x1402
@@ -26,15 +24,14 @@ ALC_7POINT1_SOFT = 0x1506
 ALC_FORMAT_CHANNELS_SOFT = 0x1990
 ALC_FORMAT_TYPE_SOFT = 0x1991
 
-try:
-    alcLoopbackOpenDeviceSOFT = _bind("alcLoopbackOpenDeviceSOFT", [ctypes.POINTER(ALCchar)], ctypes.POINTER(ALCdevice))
-    alcGetStringiSOFT = _bind("alcGetStringiSOFT", [ctypes.POINTER(ALCdevice),
-                                                      ctypes.POINTER(ALCenum),
-                                                      ctypes.POINTER(ALCsizei)])
-    alcResetDeviceSOFT = _bind("alcResetDeviceSOFT", [ctypes.POINTER(ALCdevice),
-                                                      ctypes.POINTER(ALCint)])
-    alcRenderSamplesSOFT = _bind("alcRenderSamplesSOFT", [ctypes.POINTER(ALCdevice), ctypes.POINTER(ALCvoid), ALCsizei])
-except AttributeError:
-    logger.warning("OpenAL-Soft functions could not be bound")
-else:
-    __all__.extend(("alcLoopbackOpenDeviceSOFT", "alcGetStringiSOFT", "alcResetDeviceSOFT", "alcRenderSamplesSOFT"))
+# OpenAL-Soft extensions, bound on first access through __getattr__
+_optional = {
+    "alcLoopbackOpenDeviceSOFT": ([ctypes.POINTER(ALCchar)], ctypes.POINTER(ALCdevice)),
+    "alcGetStringiSOFT": ([ctypes.POINTER(ALCdevice), ctypes.POINTER(ALCenum), ctypes.POINTER(ALCsizei)], None),
+    "alcResetDeviceSOFT": ([ctypes.POINTER(ALCdevice), ctypes.POINTER(ALCint)], None),
+    "alcRenderSamplesSOFT": ([ctypes.POINTER(ALCdevice), ctypes.POINTER(ALCvoid), ALCsizei], None),
+}
+
+
+def __getattr__(name):
+    return dll.bind_optional(sys.modules[__name__], name, _optional, "OpenAL-Soft functions could not be bound")
@@ -0,0 +1,166 @@
+import multiprocessing
+import queue
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from fighting_sound.models.audio_source import AudioSource
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al, soft
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.audio_frame_ring import AudioFrameRing
+from fighting_sound.utils.dtype import channel_format_map
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED, LAYOUT_PLANAR, deinterleave
+
+# SoundManager methods a command batch may call; the first argument of a source method is a source handle
+source_methods = {"play", "play3d", "stop", "set_source_pos", "set_source_pos3d", "set_source_gain", "set_source_pitch"}
+farm_methods = source_methods | {"set_listener_position", "set_listener_velocity", "set_listener_orientation", "stop_all"}
+
+# how often receive() checks that the worker it waits on is still alive
+POLL_INTERVAL = 0.1
+
+
+def apply_command(sound_manager: SoundManager, sources: Dict[int, AudioSource], command: Tuple) -> None:
+    # commands are (method, *args); sources are referred to by integer handles and buffers by sound name
+    method, *args = command
+    if method == "create_source":
+        sources[args[0]] = sound_manager.create_audio_source()
+        return
+    if method == "remove_source":
+        sound_manager.remove_source(sources.pop(args[0]))
+        return
+    if method not in farm_methods:
+        raise ValueError(f"Invalid command: {method}")
+    if method in source_methods:
+        args[0] = sources[args[0]]
+    if method in ("play", "play3d"):
+        args[1] = sound_manager.get_sound_buffer(args[1])
+    getattr(sound_manager, method)(*args)
+
+
+def create_worker_sound_manager(sounds: Path, nchannels: int, sample_rate: int) -> SoundManager:
+    sound_manager = SoundManager()
+    try:
+        sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer(soft.ALC_FLOAT_SOFT, channel_format_map[nchannels], sample_rate))
+        if sounds is not None:
+            sound_manager.load_sounds(sounds)
+    except Exception:
+        sound_manager.close()
+        raise
+    return sound_manager
+
+
+def run_render_worker(ring_name: str, sounds: Path, render_size: int, nchannels: int, sample_rate: int, commands, results) -> None:
+    # every batch gets exactly one result, so receive() never waits on a worker that failed to start
+    ring = None
+    sound_manager = None
+    startup_error = None
+    try:
+        ring = AudioFrameRing.attach(ring_name)
+        sound_manager = create_worker_sound_manager(sounds, nchannels, sample_rate)
+    except Exception as exc:
+        startup_error = f"startup failed: {exc!r}"
+    sources: Dict[int, AudioSource] = {}
+    try:
+        while True:
+            batch = commands.get()
+            if batch is None:
+                break
+            batch_commands, n_frames = batch
+            if startup_error is not None:
+                results.put((0, n_frames, startup_error))
+                continue
+            out = ring.begin_write()
+            error = None
+            try:
+                for command in batch_commands:
+                    apply_command(sound_manager, sources, command)
+                frames = out[:n_frames * render_size].reshape(n_frames, render_size, nchannels)
+                sound_manager.sample_audio_batch(n_frames, render_size, al.ALfloat, nchannels, out=frames, layout=LAYOUT_INTERLEAVED)
+            except Exception as exc:
+                error = repr(exc)
+            results.put((ring.commit(), n_frames, error))
+    finally:
+        try:
+            if sound_manager is not None:
+                sound_manager.close()
+        finally:
+            if ring is not None:
+                ring.close()
+
+
+class RenderWorker:
+    def __init__(self, context, sounds: Path, render_size: int, nchannels: int, sample_rate: int, slots: int, frames_per_slot: int) -> None:
+        self.ring = AudioFrameRing.create(slots, (frames_per_slot * render_size, nchannels))
+        self.commands = context.Queue()
+        self.results = context.Queue()
+        self.pending = 0
+        self.process = context.Process(target=run_render_worker, daemon=True,
+                                       args=(self.ring.name, sounds, render_size, nchannels, sample_rate, self.commands, self.results))
+        self.process.start()
+
+
+class RenderFarm:
+    # one loopback renderer per worker process, each match gets a worker; rendered audio comes back
+    # through a per-worker AudioFrameRing of `slots` blocks of up to `frames_per_slot` frames
+    workers: List[RenderWorker]
+
+    def __init__(self, num_workers: int, sounds: Path = None, render_size: int = 800, nchannels: int = 2, sample_rate: int = 48000,
+                 slots: int = 4, frames_per_slot: int = 1, start_method: str = "spawn") -> None:
+        if nchannels not in channel_format_map:
+            raise ValueError(f"Invalid number of channels: {nchannels}")
+        self.render_size = render_size
+        self.nchannels = nchannels
+        self.frames_per_slot = frames_per_slot
+        context = multiprocessing.get_context(start_method)
+        self.workers = [RenderWorker(context, sounds, render_size, nchannels, sample_rate, slots, frames_per_slot)
+                        for _ in range(num_workers)]
+
+    def __len__(self) -> int:
+        return len(self.workers)
+
+    def submit(self, worker: int, commands: List[Tuple], n_frames: int = 1) -> None:
+        render_worker = self.workers[worker]
+        if n_frames > self.frames_per_slot:
+            raise ValueError(f"Cannot render more than {self.frames_per_slot} frames per batch")
+        if render_worker.pending >= render_worker.ring.slots:
+            raise RuntimeError("Render ring is full, receive() the pending frames first")
+        render_worker.pending += 1
+        render_worker.commands.put((commands, n_frames))
+
+    def receive(self, worker: int, layout: str = LAYOUT_PLANAR, timeout: float = None) -> np.ndarray:
+        # the returned array is a view into the ring, valid until the slot is rendered again
+        render_worker = self.workers[worker]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_INTERVAL if deadline is None else max(0.0, min(POLL_INTERVAL, deadline - time.monotonic()))
+            try:
+                seq, n_frames, error = render_worker.results.get(timeout=wait)
+                break
+            except queue.Empty:
+                pass
+            if not render_worker.process.is_alive():
+                # a worker that crashed, e.g. inside OpenAL, never answers; one that answered and then exited has
+                # its result in the pipe already
+                try:
+                    seq, n_frames, error = render_worker.results.get_nowait()
+                    break
+                except queue.Empty:
+                    raise RuntimeError(f"Render worker {worker} exited with code {render_worker.process.exitcode}") from None
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("Render worker did not answer in time")
+        render_worker.pending -= 1
+        if error is not None:
+            raise RuntimeError(f"Render worker {worker} failed: {error}")
+        frames = render_worker.ring.read(seq)[:n_frames * self.render_size]
+        return deinterleave(frames.reshape((n_frames, self.render_size, self.nchannels)), layout)
+
+    def close(self) -> None:
+        for render_worker in self.workers:
+            render_worker.commands.put(None)
+        for render_worker in self.workers:
+            render_worker.process.join()
+            render_worker.ring.close()
+        self.workers = []
@@ -1,27 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
 
 import numpy as np
 
 from fighting_sound.models.audio_buffer import AudioBuffer
 from fighting_sound.models.audio_source import AudioSource
+from fighting_sound.models.file_stream import FileStream
+from fighting_sound.models.frame_commands import FrameCommands
 from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.models.streaming_source import StreamingSource
+from fighting_sound import openal
 from fighting_sound.openal import al
+from fighting_sound.utils.audio_frame_ring import AudioFrameRing
+from fighting_sound.utils.bank import SoundBank
+from fighting_sound.utils.dtype import channel_count_map, format_dtype_map
+from fighting_sound.utils.encoding import EncodingProfile, encode_audio
+from fighting_sound.utils.features import FeatureExtractor
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED, LAYOUT_PLANAR
 from fighting_sound.utils.openal import set_source_attribute
+from fighting_sound.utils.profiling import MethodProfiler
+from fighting_sound.utils.recorder import EventRecorder
+from fighting_sound.utils.wave import list_sounds, load_sound
+
+profiling_methods = {"enable_profiling", "disable_profiling", "stats"}
 
 
 class SoundManager:
-    sound_renderers: List[SoundRenderer] = []
-    audio_sources: List[AudioSource] = []
-    audio_buffers: List[AudioBuffer] = []
-    sound_buffers: Dict[str, AudioBuffer] = {}
-    virtual_renderer: SoundRenderer = None
-    default_renderer: SoundRenderer = None
+    sound_renderers: List[SoundRenderer]
+    audio_sources: List[AudioSource]
+    audio_buffers: List[AudioBuffer]
+    sound_buffers: Dict[str, AudioBuffer]
+    virtual_renderer: SoundRenderer
+    default_renderer: SoundRenderer
     virtual_renderer_index:int
     default_renderer_index:int
+    streaming_sources: Dict[int, StreamingSource]
+    stream_buffers: int
+    file_streams: Dict[int, FileStream]
+    frame_commands: FrameCommands
+    deferred: bool
+    feature_extractor: FeatureExtractor
+    profiler: MethodProfiler
+    # whether AL call profiling, which is process-wide, was turned on by this manager
+    profiling_openal: bool
+    recorder: EventRecorder
 
     def __init__(self) -> None:
-        pass
+        self.sound_renderers = []
+        self.audio_sources = []
+        self.audio_buffers = []
+        self.sound_buffers = {}
+        self.virtual_renderer = None
+        self.default_renderer = None
+        self.streaming_sources = {}
+        self.stream_buffers = 8
+        self.file_streams = {}
+        self.frame_commands = None
+        self.deferred = False
+        self.feature_extractor = None
+        self.profiler = None
+        self.profiling_openal = False
+        self.recorder = None
 
     def set_default_renderer(self, sound_renderer: SoundRenderer) -> None:
         self.default_renderer = sound_renderer
@@ -33,35 +73,110 @@ class SoundManager:
         self.virtual_renderer_index = len(self.sound_renderers)
         self.sound_renderers.append(virtual_renderer)
 
+    def enable_thread_local_contexts(self, start_threads: bool = False) -> None:
+        # with start_threads every renderer gets its own thread and the per-renderer work of each call runs there,
+        # so the loopback renderer and the device renderer are driven concurrently
+        for sound_renderer in self.sound_renderers:
+            sound_renderer.enable_thread_context()
+            if start_threads:
+                sound_renderer.start_thread()
+
+    def for_each_renderer(self, fn: Callable[[int, SoundRenderer], Any]) -> List[Any]:
+        # fn(i, sound_renderer) is one renderer's share of a call, renderers with a started thread run it there
+        futures = [sound_renderer.submit(fn, i, sound_renderer) if sound_renderer.executor is not None else None
+                   for i, sound_renderer in enumerate(self.sound_renderers)]
+        return [fn(i, sound_renderer) if future is None else future.result()
+                for i, (sound_renderer, future) in enumerate(zip(self.sound_renderers, futures))]
+
+    def begin_frame(self) -> None:
+        # until commit_frame, source/listener updates and play/stop calls are queued and coalesced
+        if self.frame_commands is None:
+            self.frame_commands = FrameCommands()
+        self.frame_commands.clear()
+        self.deferred = True
+
+    def commit_frame(self) -> None:
+        self.deferred = False
+        if self.frame_commands is None or not len(self.frame_commands):
+            return
+        self.for_each_renderer(lambda i, sound_renderer: sound_renderer.apply_frame_commands(i, self.frame_commands))
+        self.frame_commands.clear()
+
+    def enable_profiling(self, dump_interval: float = None, openal_calls: bool = True) -> None:
+        # per-method latency histograms (and per AL/ALC function counters), dumped to the log every dump_interval seconds
+        if self.profiler is None:
+            methods = [name for name, value in vars(SoundManager).items()
+                       if callable(value) and not name.startswith("_") and name not in profiling_methods]
+            self.profiler = MethodProfiler(self, methods, dump_interval)
+            self.profiler.start()
+        if openal_calls and not openal.dll.profiling:
+            openal.enable_profiling()
+            self.profiling_openal = True
+
+    def disable_profiling(self) -> None:
+        # AL call profiling enabled elsewhere, by another manager or PYAL_PROFILE, stays on
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler = None
+        if self.profiling_openal:
+            openal.disable_profiling()
+            self.profiling_openal = False
+
+    def stats(self) -> Dict[str, Any]:
+        if self.profiler is None:
+            raise ValueError("Profiling not enabled")
+        return self.profiler.stats()
+
+    def start_recording(self, file_path: Path, chunk_size: int = 65536) -> EventRecorder:
+        # logs every source/listener call with the sample it happened at, replayable with OfflineRenderer;
+        # the clock follows the virtual renderer, without one call recorder.advance() once per frame
+        if self.recorder is not None:
+            raise ValueError("Recording already started")
+        self.recorder = EventRecorder(file_path, self.sound_buffers, chunk_size)
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
     def set_listener_position(self, x: float, y: float, z: float) -> None:
+        if self.recorder is not None:
+            self.recorder.record_listener_position(x, y, z)
         listener_pos = [x, y, z]
-        for sound_renderer in self.sound_renderers:
-            sound_renderer.al_listener_fv(al.AL_POSITION, listener_pos)
+        if self.deferred:
+            self.frame_commands.set_listener_attribute(al.AL_POSITION, listener_pos)
+            return
+        self.for_each_renderer(lambda i, sound_renderer: sound_renderer.al_listener_fv(al.AL_POSITION, listener_pos))
 
     def set_listener_velocity(self, x: float, y: float, z: float) -> None:
+        if self.recorder is not None:
+            self.recorder.record_listener_velocity(x, y, z)
         listener_vel = [x, y, z]
-        for sound_renderer in self.sound_renderers:
-            sound_renderer.al_listener_fv(al.AL_VELOCITY, listener_vel)
+        if self.deferred:
+            self.frame_commands.set_listener_attribute(al.AL_VELOCITY, listener_vel)
+            return
+        self.for_each_renderer(lambda i, sound_renderer: sound_renderer.al_listener_fv(al.AL_VELOCITY, listener_vel))
 
     def set_listener_orientation(self, x: float, y: float, z: float, x_up: float, y_up: float, z_up: float) -> None:
+        if self.recorder is not None:
+            self.recorder.record_listener_orientation(x, y, z, x_up, y_up, z_up)
         listener_ori = [x, y, z, x_up, y_up, z_up]
-        for sound_renderer in self.sound_renderers:
-            sound_renderer.al_listener_fv(al.AL_ORIENTATION, listener_ori)
+        if self.deferred:
+            self.frame_commands.set_listener_attribute(al.AL_ORIENTATION, listener_ori)
+            return
+        self.for_each_renderer(lambda i, sound_renderer: sound_renderer.al_listener_fv(al.AL_ORIENTATION, listener_ori))
     
     def create_audio_source(self, attrs: dict = {}) -> AudioSource:
         contexts = [sound_renderer.context for sound_renderer in self.sound_renderers]
-        source_ids = [0] * len(self.sound_renderers)
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_ids[i] = sound_renderer.create_source(attrs)
+        source_ids = self.for_each_renderer(lambda i, sound_renderer: sound_renderer.create_source(attrs))
         audio_source = AudioSource(contexts, source_ids)
         self.audio_sources.append(audio_source)
         return audio_source
 
     def create_audio_buffer(self, file_path: Path = None) -> AudioBuffer:
         contexts = [sound_renderer.context for sound_renderer in self.sound_renderers]
-        buffer_ids = [0] * len(self.sound_renderers)
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            buffer_ids[i] = sound_renderer.create_buffer()
+        buffer_ids = self.for_each_renderer(lambda i, sound_renderer: sound_renderer.create_buffer())
         audio_buffer = AudioBuffer(contexts, buffer_ids)
         if file_path is not None:
             audio_buffer.register_sound(file_path)
@@ -69,13 +184,50 @@ class SoundManager:
         self.audio_buffers.append(audio_buffer)
         return audio_buffer
 
+    def load_sound_bank(self, sounds: Union[Path, Iterable[Path]], workers: int = 8) -> Dict[str, AudioBuffer]:
+        paths = list_sounds(sounds)
+        # file I/O and WAV parsing release the GIL, the uploads then go per renderer in one pass
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            decoded = list(executor.map(load_sound, paths))
+        sounds = [(alformat, wavbuf, len(wavbuf), samplerate) for alformat, wavbuf, samplerate in decoded]
+        return self.upload_sounds([path.name for path in paths], sounds)
+
+    def load_sounds(self, sounds: Path) -> Dict[str, AudioBuffer]:
+        # a directory of WAV files or a packed sound bank
+        if Path(sounds).is_dir():
+            return self.load_sound_bank(sounds)
+        return self.load_bank(sounds)
+
+    def load_bank(self, file_path: Path) -> Dict[str, AudioBuffer]:
+        with SoundBank(file_path) as bank:
+            names = bank.names()
+            return self.upload_sounds(names, [bank.get_sound(name) for name in names])
+
+    def upload_sounds(self, names: List[str], sounds: List[Tuple[int, Any, int, int]]) -> Dict[str, AudioBuffer]:
+        contexts = [sound_renderer.context for sound_renderer in self.sound_renderers]
+
+        def upload(i: int, sound_renderer: SoundRenderer) -> List[int]:
+            renderer_buffer_ids = sound_renderer.create_buffers(len(names))
+            sound_renderer.buffer_data(renderer_buffer_ids, sounds)
+            return renderer_buffer_ids
+
+        buffer_ids = self.for_each_renderer(upload)
+        for j, name in enumerate(names):
+            audio_buffer = AudioBuffer(contexts, [renderer_buffer_ids[j] for renderer_buffer_ids in buffer_ids])
+            self.sound_buffers[name] = audio_buffer
+            self.audio_buffers.append(audio_buffer)
+        return self.sound_buffers
+
     def is_playing(self, source: AudioSource) -> bool:
-        ans = False
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            ans = ans or sound_renderer.is_playing(source_id)
-        return ans
+        return any(self.for_each_renderer(lambda i, sound_renderer: sound_renderer.is_playing(source.get_source_ids()[i])))
     
+    def are_playing(self, sources: List[AudioSource]) -> List[bool]:
+        ans = [False] * len(sources)
+        for states in self.for_each_renderer(
+                lambda i, sound_renderer: sound_renderer.get_source_states([source.get_source_ids()[i] for source in sources])):
+            ans = [playing or state == al.AL_PLAYING for playing, state in zip(ans, states)]
+        return ans
+
     def play(self, source: AudioSource, buffer: AudioBuffer, x: float, y: float, loop: bool) -> None:
         self.play3d(source, buffer, x, 0, y, loop)
 
@@ -88,66 +240,173 @@ class SoundManager:
             self.default_renderer.play2(source_id, buffer_id, x, 0, y, loop)
 
     def play3d(self, source: AudioSource, buffer: AudioBuffer, x: float, y: float, z: float, loop: bool) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            buffer_id = buffer.get_buffers()[i]
-            sound_renderer.play2(source_id, buffer_id, x, y, z, loop)
+        if self.recorder is not None:
+            self.recorder.record_play(source, buffer, x, y, z, loop)
+        if self.deferred:
+            self.frame_commands.set_source_attribute(source, al.AL_POSITION, [float(x), float(y), float(z)])
+            self.frame_commands.play(source, buffer, loop)
+            return
+        self.for_each_renderer(
+            lambda i, sound_renderer: sound_renderer.play2(source.get_source_ids()[i], buffer.get_buffers()[i], x, y, z, loop))
 
     def stop(self, source: AudioSource) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            sound_renderer.stop(source_id)
+        if self.recorder is not None:
+            self.recorder.record_stop(source)
+        if self.deferred:
+            self.frame_commands.stop(source)
+            return
+        self.for_each_renderer(lambda i, sound_renderer: sound_renderer.stop(source.get_source_ids()[i]))
 
     def set_source_pos(self, source: AudioSource, x: float, y: float) -> None:
         self.set_source_pos3d(source, x, 0, y)
 
     def set_source_pos3d(self, source: AudioSource, x: float, y: float, z: float) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            set_source_attribute(source_id, al.AL_POSITION, [x, y, z], context=sound_renderer.context)
+        if self.recorder is not None:
+            self.recorder.record_position(source, x, y, z)
+        if self.deferred:
+            self.frame_commands.set_source_attribute(source, al.AL_POSITION, [float(x), float(y), float(z)])
+            return
+        self.for_each_renderer(
+            lambda i, sound_renderer: set_source_attribute(source.get_source_ids()[i], al.AL_POSITION, [x, y, z], context=sound_renderer.context))
 
     def set_source_gain(self, source: AudioSource, gain: float) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            set_source_attribute(source_id, al.AL_GAIN, gain, context=sound_renderer.context)
+        if self.recorder is not None:
+            self.recorder.record_gain(source, gain)
+        if self.deferred:
+            self.frame_commands.set_source_attribute(source, al.AL_GAIN, float(gain))
+            return
+        self.for_each_renderer(
+            lambda i, sound_renderer: set_source_attribute(source.get_source_ids()[i], al.AL_GAIN, gain, context=sound_renderer.context))
 
     def set_source_pitch(self, source: AudioSource, pitch: float) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            set_source_attribute(source_id, al.AL_PITCH, pitch, context=sound_renderer.context)
+        if self.recorder is not None:
+            self.recorder.record_pitch(source, pitch)
+        if self.deferred:
+            self.frame_commands.set_source_attribute(source, al.AL_PITCH, float(pitch))
+            return
+        self.for_each_renderer(
+            lambda i, sound_renderer: set_source_attribute(source.get_source_ids()[i], al.AL_PITCH, pitch, context=sound_renderer.context))
 
     def get_sound_buffer(self, sound_name: str) -> AudioBuffer:
         return self.sound_buffers.get(sound_name)
 
-    def sample_audio(self, dtype: type = al.ALfloat, render_size: int = 800, nchannels: int = 2) -> np.ndarray:
+    def sample_audio(self, dtype: type = al.ALfloat, render_size: int = 800, nchannels: int = 2, out: np.ndarray = None, reuse_buffer: bool = False,
+                     layout: str = LAYOUT_PLANAR) -> np.ndarray:
         if not self.virtual_renderer:
             raise ValueError("Virtual renderer not set")
-        return self.virtual_renderer.sample_audio(dtype, render_size, nchannels)
+        if self.recorder is not None:
+            self.recorder.advance(render_size)
+        return self.virtual_renderer.sample_audio(dtype, render_size, nchannels, out, reuse_buffer, layout)
     
+    def sample_audio_batch(self, n_frames: int, render_size: int = 800, dtype: type = al.ALfloat, nchannels: int = 2, out: np.ndarray = None,
+                           reuse_buffer: bool = False, layout: str = LAYOUT_PLANAR) -> np.ndarray:
+        if not self.virtual_renderer:
+            raise ValueError("Virtual renderer not set")
+        if self.recorder is not None:
+            self.recorder.advance(n_frames * render_size)
+        return self.virtual_renderer.sample_audio_batch(dtype, n_frames, render_size, nchannels, out, reuse_buffer, layout)
+
+    def sample_audio_encoded(self, profiles: List[EncodingProfile], render_size: int = 800) -> List[bytes]:
+        # renders once in the virtual renderer's own format, then encodes per consumer profile
+        if not self.virtual_renderer:
+            raise ValueError("Virtual renderer not set")
+        dtype = format_dtype_map.get(self.virtual_renderer.format, al.ALfloat)
+        nchannels = channel_count_map.get(self.virtual_renderer.channel, 2)
+        sample_rate = self.virtual_renderer.sample_rate or 48000
+        audio = self.sample_audio(dtype, render_size, nchannels, reuse_buffer=True)
+        return [encode_audio(audio, profile, sample_rate) for profile in profiles]
+
+    def set_feature_extractor(self, feature_extractor: FeatureExtractor) -> None:
+        self.feature_extractor = feature_extractor
+
+    def sample_features(self, render_size: int = 800, include_audio: bool = False) -> Dict[str, np.ndarray]:
+        if not self.feature_extractor:
+            raise ValueError("Feature extractor not set")
+        audio = self.sample_audio(al.ALfloat, render_size, self.feature_extractor.nchannels, reuse_buffer=True)
+        features = self.feature_extractor.process(audio)
+        if include_audio:
+            features["audio"] = audio.copy()
+        return features
+
+    def sample_audio_to_ring(self, ring: AudioFrameRing, dtype: type = al.ALfloat) -> int:
+        # renders straight into the ring's next slot; ring frames are interleaved (..., render_size, nchannels)
+        if not self.virtual_renderer:
+            raise ValueError("Virtual renderer not set")
+        out = ring.begin_write()
+        if self.recorder is not None:
+            self.recorder.advance(int(np.prod(ring.frame_shape[:-1])))
+        self.virtual_renderer.render(dtype, ring.frame_shape[:-1], ring.frame_shape[-1], out, layout=LAYOUT_INTERLEAVED)
+        return ring.commit()
+
     def remove_source(self, source: AudioSource) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            sound_renderer.delete_source(source_id)
+        file_stream = self.file_streams.pop(id(source), None)
+        if file_stream is not None:
+            file_stream.close()
+        stream = self.streaming_sources.pop(id(source), None)
+        if stream is not None:
+            stream.close()
+        self.for_each_renderer(lambda i, sound_renderer: sound_renderer.delete_source(source.get_source_ids()[i]))
         self.audio_sources.remove(source)
 
-    def playback(self, source: AudioSource, format: int, audio_sample: bytes, sample_rate: int) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            sound_renderer.playback(source_id, format, audio_sample, sample_rate)
+    def get_streaming_source(self, source: AudioSource) -> StreamingSource:
+        stream = self.streaming_sources.get(id(source))
+        if stream is None:
+            stream = StreamingSource(self.sound_renderers, source, self.stream_buffers)
+            self.streaming_sources[id(source)] = stream
+        return stream
+
+    def playback(self, source: AudioSource, format: int, audio_sample: bytes, sample_rate: int) -> bool:
+        queued = self.get_streaming_source(source).queue(format, audio_sample, sample_rate)
+        if queued and self.recorder is not None:
+            self.recorder.record_playback(source, format, audio_sample, sample_rate)
+        return queued
+
+    def stream_file(self, source: AudioSource, file_path: Path, chunk_ms: int = 100, queue_size: int = 4, loop: bool = False) -> FileStream:
+        # the file is decoded on a background thread, update_streams() moves the chunks into OpenAL
+        self.stop_playback(source)
+        file_stream = FileStream(self.get_streaming_source(source), file_path, chunk_ms, queue_size, loop)
+        self.file_streams[id(source)] = file_stream
+        return file_stream
+
+    def update_streams(self) -> None:
+        # a stream whose decoder failed is dropped before its error propagates
+        for key, file_stream in list(self.file_streams.items()):
+            try:
+                active = file_stream.update()
+            except Exception:
+                del self.file_streams[key]
+                raise
+            if not active:
+                del self.file_streams[key]
 
     def stop_playback(self, source: AudioSource) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
-            source_id = source.get_source_ids()[i]
-            sound_renderer.stop_playback(source_id)
+        file_stream = self.file_streams.pop(id(source), None)
+        if file_stream is not None:
+            file_stream.close()
+        stream = self.streaming_sources.get(id(source))
+        if stream is not None:
+            stream.stop()
 
     def stop_all(self) -> None:
         for audio_source in self.audio_sources:
             self.stop(audio_source)
 
     def close(self) -> None:
-        for i, sound_renderer in enumerate(self.sound_renderers):
+        self.stop_recording()
+        for file_stream in self.file_streams.values():
+            file_stream.close()
+        self.file_streams.clear()
+        for stream in self.streaming_sources.values():
+            stream.close()
+        self.streaming_sources.clear()
+
+        def delete_all(i: int, sound_renderer: SoundRenderer) -> None:
             for audio_buffer in self.audio_buffers:
                 sound_renderer.delete_buffer(audio_buffer.get_buffers()[i])
             for audio_source in self.audio_sources:
                 sound_renderer.delete_source(audio_source.get_source_ids()[i])
+
+        self.for_each_renderer(delete_all)
+        # close() joins the renderer's thread, so it runs here
+        for sound_renderer in self.sound_renderers:
             sound_renderer.close()
@@ -0,0 +1,128 @@
+import sys
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+
+import numpy as np
+
+RING_MAGIC = 0x46535247  # "FSRG"
+MAX_FRAME_DIMS = 4
+
+# header of int64 fields: magic, slots, dtype char, ndim, frame shape (MAX_FRAME_DIMS), published sequence
+HEADER_FIELDS = 5 + MAX_FRAME_DIMS
+SEQ_FIELD = HEADER_FIELDS - 1
+
+tracker_lock = threading.Lock()
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    # a reader must neither unlink the writer's segment when it exits nor drop the writer's registration
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    with tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class AudioFrameRing:
+    # single writer, any number of readers, no locks: every slot carries a sequence word that is odd
+    # while the writer is filling it and 2 * seq once frame `seq` (counted from 1) is complete
+    name: str
+    slots: int
+    frame_shape: Tuple[int, ...]
+
+    def __init__(self, shm: SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if self.header[0] != RING_MAGIC:
+            raise ValueError(f"Not an audio frame ring: {shm.name}")
+        self.slots = int(self.header[1])
+        self.dtype = np.dtype(chr(self.header[2]))
+        self.frame_shape = tuple(int(dim) for dim in self.header[4:4 + self.header[3]])
+        offset = self.header.nbytes
+        self.slot_seqs = np.ndarray((self.slots,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.slot_seqs.nbytes
+        self.frames = np.ndarray((self.slots,) + self.frame_shape, dtype=self.dtype, buffer=shm.buf, offset=offset)
+        self.write_seq = int(self.header[SEQ_FIELD])
+
+    @staticmethod
+    def size_of(slots: int, frame_shape: Tuple[int, ...], dtype) -> int:
+        return 8 * (HEADER_FIELDS + slots) + slots * int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+
+    @staticmethod
+    def create(slots: int, frame_shape: Tuple[int, ...], dtype=np.float32, name: str = None) -> "AudioFrameRing":
+        if len(frame_shape) > MAX_FRAME_DIMS:
+            raise ValueError(f"Frames can have at most {MAX_FRAME_DIMS} dimensions")
+        shm = SharedMemory(name=name, create=True, size=AudioFrameRing.size_of(slots, frame_shape, dtype))
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[1] = slots
+        header[2] = ord(np.dtype(dtype).char)
+        header[3] = len(frame_shape)
+        header[4:4 + len(frame_shape)] = frame_shape
+        header[0] = RING_MAGIC
+        np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=header.nbytes)[:] = 0
+        del header
+        return AudioFrameRing(shm, True)
+
+    @staticmethod
+    def attach(name: str) -> "AudioFrameRing":
+        return AudioFrameRing(attach_shared_memory(name), False)
+
+    def begin_write(self) -> np.ndarray:
+        # returns the next slot for the writer to fill in place, published by commit()
+        seq = self.write_seq + 1
+        slot = (seq - 1) % self.slots
+        self.slot_seqs[slot] = 2 * seq - 1
+        return self.frames[slot]
+
+    def commit(self) -> int:
+        seq = self.write_seq + 1
+        self.slot_seqs[(seq - 1) % self.slots] = 2 * seq
+        self.header[SEQ_FIELD] = seq
+        self.write_seq = seq
+        return seq
+
+    def write(self, frame: np.ndarray) -> int:
+        self.begin_write()[...] = frame
+        return self.commit()
+
+    def get_latest_seq(self) -> int:
+        return int(self.header[SEQ_FIELD])
+
+    def read(self, seq: int) -> np.ndarray:
+        # zero-copy view of frame `seq`, or None if it is not published yet or already overwritten;
+        # check is_valid(seq) after using the view to detect that the writer lapped the reader meanwhile
+        if seq < 1 or not self.is_valid(seq):
+            return None
+        return self.frames[(seq - 1) % self.slots]
+
+    def read_copy(self, seq: int) -> np.ndarray:
+        frame = self.read(seq)
+        if frame is None:
+            return None
+        frame = frame.copy()
+        return frame if self.is_valid(seq) else None
+
+    def is_valid(self, seq: int) -> bool:
+        return self.slot_seqs[(seq - 1) % self.slots] == 2 * seq
+
+    def latest(self) -> Tuple[int, np.ndarray]:
+        seq = self.get_latest_seq()
+        return seq, self.read(seq)
+
+    def close(self) -> None:
+        if self.shm is None:
+            return
+        self.header = self.slot_seqs = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
@@ -0,0 +1,89 @@
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+from fighting_sound.utils.wave import MappedSound, list_sounds
+
+# layout: header, entry table, then the PCM of every entry starting on an aligned offset
+BANK_MAGIC = b"FSBK"
+BANK_VERSION = 1
+BANK_ALIGNMENT = 64
+BANK_NAME_SIZE = 64
+
+header_struct = struct.Struct("<4sHHI")  # magic, version, alignment, count
+entry_struct = struct.Struct(f"<{BANK_NAME_SIZE}sIIQQ")  # name, alformat, samplerate, offset, length
+
+
+def align(offset: int, alignment: int) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def pack_sound_bank(sounds: Union[Path, Iterable[Path]], output_path: Path, alignment: int = BANK_ALIGNMENT) -> int:
+    paths = list_sounds(sounds)
+    mapped = [MappedSound(path) for path in paths]
+    try:
+        entries = []
+        offset = align(header_struct.size + entry_struct.size * len(paths), alignment)
+        for path, sound in zip(paths, mapped):
+            name = path.name.encode("utf-8")
+            if len(name) >= BANK_NAME_SIZE:
+                raise ValueError(f"Sound name too long for bank: {path.name}")
+            entries.append((name, sound.alformat, sound.samplerate, offset, sound.size))
+            offset = align(offset + sound.size, alignment)
+        with open(output_path, "wb") as fp:
+            fp.write(header_struct.pack(BANK_MAGIC, BANK_VERSION, alignment, len(entries)))
+            for entry in entries:
+                fp.write(entry_struct.pack(*entry))
+            for entry, sound in zip(entries, mapped):
+                fp.write(b"\0" * (entry[3] - fp.tell()))
+                fp.write(sound.data)
+    finally:
+        for sound in mapped:
+            sound.close()
+    return len(entries)
+
+
+class SoundBank:
+    # name -> (alformat, samplerate, offset, length)
+    entries: Dict[str, Tuple[int, int, int, int]]
+
+    def __init__(self, file_path: Path) -> None:
+        with open(file_path, "rb") as fp:
+            self.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, count = header_struct.unpack_from(self.mmap, 0)
+            if magic != BANK_MAGIC or version != BANK_VERSION:
+                raise ValueError(f"Not a version {BANK_VERSION} sound bank: {file_path}")
+            self.entries = {}
+            for i in range(count):
+                name, alformat, samplerate, offset, length = entry_struct.unpack_from(self.mmap, header_struct.size + entry_struct.size * i)
+                if offset + length > len(self.mmap):
+                    raise ValueError(f"Truncated sound bank: {file_path}")
+                self.entries[name.rstrip(b"\0").decode("utf-8")] = (alformat, samplerate, offset, length)
+        except Exception:
+            self.mmap.close()
+            raise
+        self.data = np.frombuffer(self.mmap, dtype=np.uint8)
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def get_sound(self, name: str) -> Tuple[int, int, int, int]:
+        # returns (alformat, data pointer, size, samplerate), ready for alBufferData
+        alformat, samplerate, offset, length = self.entries[name]
+        return alformat, self.data.ctypes.data + offset, length, samplerate
+
+    def close(self) -> None:
+        if self.mmap is not None:
+            self.data = None
+            self.mmap.close()
+            self.mmap = None
+
+    def __enter__(self) -> "SoundBank":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
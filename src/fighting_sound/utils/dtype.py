@@ -1,6 +1,6 @@
 import numpy as np
 
-from fighting_sound.openal import al
+from fighting_sound.openal import al, soft
 
 dtype_map = {
     al.ALbyte: np.int8,
@@ -12,3 +12,26 @@ dtype_map = {
     al.ALfloat: np.float32,
     al.ALdouble: np.float64,
 }
+
+# loopback device sample formats and channel layouts
+format_dtype_map = {
+    soft.ALC_BYTE_SOFT: al.ALbyte,
+    soft.ALC_UNSIGNED_BYTE_SOFT: al.ALubyte,
+    soft.ALC_SHORT_SOFT: al.ALshort,
+    soft.ALC_UNSIGNED_SHORT_SOFT: al.ALushort,
+    soft.ALC_INT_SOFT: al.ALint,
+    soft.ALC_UNSIGNED_INT_SOFT: al.ALuint,
+    soft.ALC_FLOAT_SOFT: al.ALfloat,
+}
+
+channel_count_map = {
+    soft.ALC_MONO_SOFT: 1,
+    soft.ALC_STEREO_SOFT: 2,
+    soft.ALC_QUAD_SOFT: 4,
+    soft.ALC_5POINT1_SOFT: 6,
+    soft.ALC_6POINT1_SOFT: 7,
+    soft.ALC_7POINT1_SOFT: 8,
+}
+
+# channel count -> loopback channel layout
+channel_format_map = {nchannels: channel for channel, nchannels in channel_count_map.items()}
@@ -0,0 +1,107 @@
+import struct
+import zlib
+
+import numpy as np
+
+from fighting_sound.openal import soft
+
+ENCODING_RAW = "raw"
+ENCODING_INT16 = "int16"
+ENCODING_INT16_ZLIB = "int16_zlib"
+
+encodings = (ENCODING_RAW, ENCODING_INT16, ENCODING_INT16_ZLIB)
+encoding_ids = {encoding: i for i, encoding in enumerate(encodings)}
+
+FLAG_DELTA = 0x1
+
+# encoding id, flags, nchannels, sample rate, nsamples, dtype char of raw payloads
+header_struct = struct.Struct("<BBHIIc")
+
+
+class EncodingProfile:
+    # how one consumer wants rendered frames: optional mono downmix and integer decimation, then
+    # raw float32, int16, or int16 with per-channel delta coding packed by zlib
+    encoding: str
+    mono: bool
+    downsample: int
+    delta: bool
+    level: int
+
+    def __init__(self, encoding: str = ENCODING_INT16_ZLIB, mono: bool = False, downsample: int = 1, delta: bool = True, level: int = 1) -> None:
+        if encoding not in encodings:
+            raise ValueError(f"Invalid encoding: {encoding}")
+        if downsample < 1:
+            raise ValueError("downsample must be at least 1")
+        self.encoding = encoding
+        self.mono = mono
+        self.downsample = downsample
+        self.delta = delta
+        self.level = level
+
+    @property
+    def render_format(self) -> int:
+        # loopback format to create a virtual renderer with when this is the only consumer
+        return soft.ALC_FLOAT_SOFT if self.encoding == ENCODING_RAW else soft.ALC_SHORT_SOFT
+
+    @property
+    def render_channel(self) -> int:
+        return soft.ALC_MONO_SOFT if self.mono else soft.ALC_STEREO_SOFT
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    # floats are full scale at 1.0; other integer formats keep their top 16 bits, unsigned ones are recentered first
+    if audio.dtype == np.int16:
+        return audio
+    if audio.dtype.kind == 'f':
+        return np.clip(np.rint(audio * 32767.0), -32768, 32767).astype(np.int16)
+    if audio.dtype.kind not in 'iu':
+        raise ValueError(f"Unsupported sample type: {audio.dtype}")
+    bits = audio.dtype.itemsize * 8
+    samples = audio.astype(np.int64)
+    if audio.dtype.kind == 'u':
+        samples -= 1 << (bits - 1)
+    if bits > 16:
+        samples >>= bits - 16
+    else:
+        samples <<= 16 - bits
+    return samples.astype(np.int16)
+
+
+def encode_audio(audio: np.ndarray, profile: EncodingProfile, sample_rate: int = 48000) -> bytes:
+    # audio is planar (nchannels, nsamples) in any loopback sample type
+    mono = profile.mono and audio.shape[0] > 1
+    if (mono or profile.downsample > 1) and audio.dtype.kind != 'f':
+        audio = to_int16(audio).astype(np.float32) / 32767.0
+    if mono:
+        audio = audio.mean(axis=0, keepdims=True, dtype=np.float32)
+    if profile.downsample > 1:
+        nsamples = audio.shape[1] // profile.downsample * profile.downsample
+        audio = audio[:, :nsamples].reshape((audio.shape[0], -1, profile.downsample)).mean(axis=-1, dtype=np.float32)
+        sample_rate //= profile.downsample
+    flags = 0
+    if profile.encoding == ENCODING_RAW:
+        payload = np.ascontiguousarray(audio)
+    else:
+        payload = to_int16(audio)
+        if profile.delta:
+            # int16 wraparound is undone exactly by the int16 cumsum in decode_audio
+            payload = np.diff(payload, axis=-1, prepend=np.zeros((payload.shape[0], 1), dtype=np.int16))
+            flags |= FLAG_DELTA
+    data = np.ascontiguousarray(payload).tobytes()
+    if profile.encoding == ENCODING_INT16_ZLIB:
+        data = zlib.compress(data, profile.level)
+    header = header_struct.pack(encoding_ids[profile.encoding], flags, payload.shape[0], sample_rate, payload.shape[1],
+                                payload.dtype.char.encode())
+    return header + data
+
+
+def decode_audio(data: bytes) -> tuple:
+    # returns (planar audio, sample rate)
+    encoding_id, flags, nchannels, sample_rate, nsamples, dtype_char = header_struct.unpack_from(data)
+    payload = data[header_struct.size:]
+    if encodings[encoding_id] == ENCODING_INT16_ZLIB:
+        payload = zlib.decompress(payload)
+    audio = np.frombuffer(payload, dtype=np.dtype(dtype_char.decode())).reshape((nchannels, nsamples))
+    if flags & FLAG_DELTA:
+        audio = np.cumsum(audio, axis=-1, dtype=np.int16)
+    return audio, sample_rate
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import numpy as np
+
+EVENT_PLAY = 0
+EVENT_STOP = 1
+EVENT_POSITION = 2
+EVENT_GAIN = 3
+EVENT_PITCH = 4
+EVENT_LISTENER_POSITION = 5
+EVENT_LISTENER_VELOCITY = 6
+EVENT_LISTENER_ORIENTATION = 7
+EVENT_PLAYBACK = 8
+
+# one fixed-size record per SoundManager call, ordered by sample:
+#   source  - source handle of the match
+#   buffer  - index into the sound name table (play) or the AL buffer format (playback)
+#   flag    - loop flag of a play
+#   offset, length, rate - payload slice and sample rate of a playback
+#   values  - position (3), gain/pitch (1) or listener orientation (6)
+event_dtype = np.dtype([
+    ("sample", "<i8"),
+    ("op", "u1"),
+    ("flag", "u1"),
+    ("source", "<i4"),
+    ("buffer", "<i4"),
+    ("length", "<i4"),
+    ("offset", "<i8"),
+    ("rate", "<i4"),
+    ("values", "<f4", (6,)),
+])
+
+
+def load_events(file_path: Path) -> np.ndarray:
+    # memory mapped, so a whole match log is never read into memory at once
+    if Path(file_path).stat().st_size == 0:
+        return np.zeros(0, dtype=event_dtype)
+    return np.memmap(file_path, dtype=event_dtype, mode="r")
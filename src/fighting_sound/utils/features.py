@@ -0,0 +1,70 @@
+from typing import Dict
+
+import numpy as np
+
+
+def hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + np.asarray(hz) / 700.0)
+
+
+def mel_to_hz(mel):
+    return 700.0 * (10.0 ** (np.asarray(mel) / 2595.0) - 1.0)
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int, fmin: float = 0.0, fmax: float = None) -> np.ndarray:
+    # (n_mels, n_fft // 2 + 1) triangular filters evenly spaced on the HTK mel scale
+    fmax = sample_rate / 2 if fmax is None else fmax
+    bin_hz = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    edges_hz = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_mels + 2))
+    lower, center, upper = edges_hz[:-2, None], edges_hz[1:-1, None], edges_hz[2:, None]
+    rising = (bin_hz - lower) / (center - lower)
+    falling = (upper - bin_hz) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+class FeatureExtractor:
+    # short-time features over planar (nchannels, samples) blocks; samples left over from a block
+    # are kept so that hops smaller than (or not dividing) the render size see a continuous signal
+    sample_rate: int
+    n_fft: int
+    hop_length: int
+    n_mels: int
+
+    def __init__(self, sample_rate: int = 48000, nchannels: int = 2, n_fft: int = 1024, hop_length: int = 400, n_mels: int = 64,
+                 fmin: float = 0.0, fmax: float = None, log_mel: bool = True) -> None:
+        if hop_length > n_fft:
+            raise ValueError("hop_length must not exceed n_fft")
+        self.sample_rate = sample_rate
+        self.nchannels = nchannels
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.log_mel = log_mel
+        # computed once, reused for every block
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+        self.mel_filters_t = np.ascontiguousarray(mel_filterbank(sample_rate, n_fft, n_mels, fmin, fmax).T)
+        self.pending = np.zeros((nchannels, 0), dtype=np.float32)
+
+    def reset(self) -> None:
+        self.pending = np.zeros((self.nchannels, 0), dtype=np.float32)
+
+    def process(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        # returns (nchannels, frames, ...) arrays; frames is 0 until n_fft samples have been seen
+        samples = np.concatenate((self.pending, audio.astype(np.float32, copy=False)), axis=-1)
+        if samples.shape[-1] < self.n_fft:
+            self.pending = samples
+            frames = np.zeros((self.nchannels, 0, self.n_fft), dtype=np.float32)
+        else:
+            n_frames = 1 + (samples.shape[-1] - self.n_fft) // self.hop_length
+            frames = np.lib.stride_tricks.sliding_window_view(samples, self.n_fft, axis=-1)[:, ::self.hop_length][:, :n_frames]
+            self.pending = samples[:, n_frames * self.hop_length:]
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        mel = power.astype(np.float32) @ self.mel_filters_t
+        if self.log_mel:
+            mel = np.log(mel + 1e-10)
+        return {
+            "spectrogram": power,
+            "mel": mel,
+            "energy": np.mean(frames ** 2, axis=-1),
+        }
@@ -0,0 +1,21 @@
+import numpy as np
+
+LAYOUT_INTERLEAVED = "interleaved"
+LAYOUT_PLANAR = "planar"
+LAYOUT_PLANAR_CONTIGUOUS = "planar_contiguous"
+
+layouts = (LAYOUT_INTERLEAVED, LAYOUT_PLANAR, LAYOUT_PLANAR_CONTIGUOUS)
+
+
+def deinterleave(frames: np.ndarray, layout: str, out: np.ndarray = None) -> np.ndarray:
+    # frames has shape (..., render_size, nchannels) as produced by alcRenderSamplesSOFT
+    if layout == LAYOUT_INTERLEAVED:
+        return frames
+    if layout == LAYOUT_PLANAR:
+        return np.swapaxes(frames, -1, -2)
+    if layout == LAYOUT_PLANAR_CONTIGUOUS:
+        if out is None:
+            return np.ascontiguousarray(np.swapaxes(frames, -1, -2))
+        np.copyto(out, np.swapaxes(frames, -1, -2))
+        return out
+    raise ValueError(f"Invalid layout: {layout}")
@@ -1,25 +1,163 @@
-from typing import Any, List
+import ctypes
+import threading
+from typing import Any, Callable, Dict, List, Set
+
+import numpy as np
 
 from fighting_sound.openal import al, alc
 
+# alcMakeContextCurrent is process-wide, so the context made current last is tracked here
+# and redundant switches are skipped
+current_context: alc.ALCcontext = None
+context_switch_counts: Dict[str, int] = {"switches": 0, "elided": 0}
+
+# addresses of the contexts made current per thread through alcSetThreadContext (ALC_EXT_thread_local_context);
+# ctypes pointers are unhashable, so contexts are keyed by address
+thread_local_contexts: Set[int] = set()
+thread_state = threading.local()
+
+
+def get_context_key(context: alc.ALCcontext) -> int:
+    return ctypes.cast(context, ctypes.c_void_p).value
+
+
+def is_thread_local_context_supported(device) -> bool:
+    return hasattr(alc, "alcSetThreadContext") and \
+        bool(alc.alcIsExtensionPresent(device, b"ALC_EXT_thread_local_context"))
+
+
+def make_context_current(context: alc.ALCcontext) -> None:
+    global current_context
+    if thread_local_contexts and get_context_key(context) in thread_local_contexts:
+        make_thread_context_current(context)
+        return
+    if context is current_context and getattr(thread_state, "context", None) is None:
+        context_switch_counts["elided"] += 1
+        return
+    # OpenAL Soft also clears the calling thread's context here
+    alc.alcMakeContextCurrent(context)
+    current_context = context
+    thread_state.context = None
+    context_switch_counts["switches"] += 1
+
+
+def make_thread_context_current(context: alc.ALCcontext) -> None:
+    if getattr(thread_state, "context", None) is context:
+        context_switch_counts["elided"] += 1
+        return
+    alc.alcSetThreadContext(context)
+    thread_state.context = context
+    context_switch_counts["switches"] += 1
+
+
+def release_context(context: alc.ALCcontext) -> None:
+    global current_context
+    if context is current_context:
+        current_context = None
+    if getattr(thread_state, "context", None) is context:
+        thread_state.context = None
+    thread_local_contexts.discard(get_context_key(context))
+
+
+def invalidate_current_context() -> None:
+    # call after alcMakeContextCurrent or alcSetThreadContext was used directly
+    global current_context
+    current_context = None
+    thread_state.context = None
+
+
+def get_context_switch_counts() -> Dict[str, int]:
+    return dict(context_switch_counts)
+
+
+def reset_context_switch_counts() -> Dict[str, int]:
+    counts = get_context_switch_counts()
+    context_switch_counts["switches"] = 0
+    context_switch_counts["elided"] = 0
+    return counts
+
+
+float_p = ctypes.POINTER(al.ALfloat)
+
+
+def get_scratch_array(ctype: type, n: int) -> ctypes.Array:
+    # reusable per-thread argument buffers for the generic list path
+    scratch = thread_state.__dict__.setdefault("scratch", {})
+    array = scratch.get(ctype)
+    if array is None or len(array) < n:
+        array = scratch[ctype] = (ctype * max(n, 16))()
+    return array
+
+
+def set_source_float(source_id: int, attr: int, value: Any) -> None:
+    al.alSourcef(source_id, attr, value)
+
+
+def set_source_int(source_id: int, attr: int, value: Any) -> None:
+    al.alSourcei(source_id, attr, value)
+
+
+def set_source_vector(source_id: int, attr: int, value: Any) -> None:
+    if type(value) is np.ndarray:
+        if value.dtype != np.float32 or not value.flags.c_contiguous:
+            value = np.ascontiguousarray(value, dtype=np.float32)
+        al.alSourcefv(source_id, attr, value.ctypes.data_as(float_p))
+    else:
+        x, y, z = value
+        al.alSource3f(source_id, attr, x, y, z)
+
+
+# attribute enum -> setter, ctypes converts ints and floats to the declared argument type
+source_setters: Dict[int, Callable[[int, int, Any], None]] = {
+    al.AL_PITCH: set_source_float,
+    al.AL_GAIN: set_source_float,
+    al.AL_MIN_GAIN: set_source_float,
+    al.AL_MAX_GAIN: set_source_float,
+    al.AL_REFERENCE_DISTANCE: set_source_float,
+    al.AL_ROLLOFF_FACTOR: set_source_float,
+    al.AL_MAX_DISTANCE: set_source_float,
+    al.AL_CONE_INNER_ANGLE: set_source_float,
+    al.AL_CONE_OUTER_ANGLE: set_source_float,
+    al.AL_CONE_OUTER_GAIN: set_source_float,
+    al.AL_SEC_OFFSET: set_source_float,
+    al.AL_POSITION: set_source_vector,
+    al.AL_VELOCITY: set_source_vector,
+    al.AL_DIRECTION: set_source_vector,
+    al.AL_SOURCE_RELATIVE: set_source_int,
+    al.AL_LOOPING: set_source_int,
+    al.AL_BUFFER: set_source_int,
+    al.AL_SAMPLE_OFFSET: set_source_int,
+    al.AL_BYTE_OFFSET: set_source_int,
+}
+
+
 def set_source_list_attribute(source_id: int, attr: int, values: List):
     if all(isinstance(item, int) for item in values):
-        func = al.alSource3i if len(values) == 3 else al.alSourceiv
-        value_arr = (al.ALint * len(values))(*values)
-        func(source_id, attr, *value_arr if len(values) == 3 else value_arr)
+        if len(values) == 3:
+            al.alSource3i(source_id, attr, *values)
+        else:
+            value_arr = get_scratch_array(al.ALint, len(values))
+            value_arr[:len(values)] = values
+            al.alSourceiv(source_id, attr, value_arr)
     elif all(isinstance(item, float) for item in values):
-        func = al.alSource3f if len(values) == 3 else al.alSourcefv
-        value_arr = (al.ALfloat * len(values))(*values)
-        func(source_id, attr, *value_arr if len(values) == 3 else value_arr)
+        if len(values) == 3:
+            al.alSource3f(source_id, attr, *values)
+        else:
+            value_arr = get_scratch_array(al.ALfloat, len(values))
+            value_arr[:len(values)] = values
+            al.alSourcefv(source_id, attr, value_arr)
     else:
         raise ValueError("List should contain either all integers or all floats")
 
 
 def set_source_attribute(source_id: int, attr: int, value: Any, context: alc.ALCcontext = None) -> None:
     if context:
-        alc.alcMakeContextCurrent(context)
-    
-    if isinstance(value, int):
+        make_context_current(context)
+
+    setter = source_setters.get(attr)
+    if setter is not None:
+        setter(source_id, attr, value)
+    elif isinstance(value, int):
         al.alSourcei(source_id, attr, value)
     elif isinstance(value, float):
         al.alSourcef(source_id, attr, value)
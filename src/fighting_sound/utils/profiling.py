@@ -0,0 +1,87 @@
+import json
+import time
+from functools import wraps
+from typing import Any, Dict, List
+
+from fighting_sound import openal
+from fighting_sound.openal.log import logger
+from fighting_sound.utils.openal import get_context_switch_counts
+
+# latency histogram buckets: bucket i counts calls shorter than 2**i microseconds
+HISTOGRAM_BUCKETS = 24
+
+
+class MethodProfiler:
+    # wraps methods of one object through instance attributes, so the class itself is never touched
+    # and an object that is not profiled pays nothing
+    target: Any
+    methods: List[str]
+    dump_interval: float
+
+    def __init__(self, target: Any, methods: List[str], dump_interval: float = None) -> None:
+        self.target = target
+        self.methods = methods
+        self.dump_interval = dump_interval
+        self.counts: Dict[str, List[float]] = {}
+        self.histograms: Dict[str, List[int]] = {}
+        self.next_dump = None
+
+    def start(self) -> None:
+        for name in self.methods:
+            setattr(self.target, name, self.wrap(name, getattr(self.target, name)))
+        if self.dump_interval:
+            self.next_dump = time.perf_counter() + self.dump_interval
+
+    def stop(self) -> None:
+        for name in self.methods:
+            self.target.__dict__.pop(name, None)
+
+    def wrap(self, name: str, method):
+        counts = self.counts.setdefault(name, [0, 0.0])
+        histogram = self.histograms.setdefault(name, [0] * HISTOGRAM_BUCKETS)
+        perf_counter = time.perf_counter
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                end = perf_counter()
+                elapsed = end - start
+                counts[0] += 1
+                counts[1] += elapsed
+                histogram[min(int(elapsed * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+                if self.next_dump is not None and end >= self.next_dump:
+                    self.next_dump = end + self.dump_interval
+                    self.dump()
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        methods = {}
+        for name, (calls, seconds) in self.counts.items():
+            if not calls:
+                continue
+            histogram = self.histograms[name]
+            methods[name] = {
+                "calls": calls,
+                "seconds": seconds,
+                "mean_us": seconds / calls * 1e6,
+                "histogram_us": {f"<{2 ** i}": n for i, n in enumerate(histogram) if n},
+            }
+        return {
+            "methods": methods,
+            "openal": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in openal.get_call_stats().items()},
+            "context_switches": get_context_switch_counts(),
+        }
+
+    def reset(self) -> None:
+        for counts in self.counts.values():
+            counts[0] = 0
+            counts[1] = 0.0
+        for histogram in self.histograms.values():
+            histogram[:] = [0] * HISTOGRAM_BUCKETS
+        openal.reset_call_stats()
+
+    def dump(self) -> None:
+        logger.info("sound profile: %s", json.dumps(self.stats()))
@@ -0,0 +1,126 @@
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from fighting_sound.utils.events import (EVENT_GAIN, EVENT_LISTENER_ORIENTATION, EVENT_LISTENER_POSITION, EVENT_LISTENER_VELOCITY,
+                                         EVENT_PITCH, EVENT_PLAY, EVENT_PLAYBACK, EVENT_POSITION, EVENT_STOP, event_dtype,
+                                         load_events)
+
+# packs one event_dtype record in a single call, much cheaper than assigning the fields one by one
+record_struct = struct.Struct("<qBBiiiqi6f")
+assert record_struct.size == event_dtype.itemsize
+
+
+class EventRecorder:
+    # logs SoundManager calls as event_dtype records into a preallocated array that doubles up to
+    # chunk_size records and is then appended to the log file; playback audio goes to <log>.payload
+    # and the sound name table to <log>.names.json, the three together feed OfflineRenderer
+    file_path: Path
+    sample: int
+    sound_names: List[str]
+
+    def __init__(self, file_path: Path, sound_buffers: Dict = None, chunk_size: int = 65536, initial_capacity: int = 1024) -> None:
+        self.file_path = Path(file_path)
+        self.sound_buffers = sound_buffers if sound_buffers is not None else {}
+        self.chunk_size = chunk_size
+        self.events = np.zeros(min(initial_capacity, chunk_size), dtype=event_dtype)
+        self.view = memoryview(self.events.view(np.uint8))
+        self.count = 0
+        self.sample = 0
+        self.source_handles: Dict[int, int] = {}
+        self.buffer_indices: Dict[int, int] = {}
+        self.sound_names = []
+        self.log_file = open(self.file_path, "wb")
+        self.payload_file = open(self.file_path.with_name(self.file_path.name + ".payload"), "wb")
+        self.payload_size = 0
+
+    def advance(self, samples: int) -> None:
+        self.sample += samples
+
+    def record(self, op: int, source: int = 0, buffer: int = 0, flag: int = 0, v0: float = 0.0, v1: float = 0.0, v2: float = 0.0,
+               v3: float = 0.0, v4: float = 0.0, v5: float = 0.0, length: int = 0, offset: int = 0, rate: int = 0) -> None:
+        if self.count == len(self.events):
+            self.grow()
+        record_struct.pack_into(self.view, self.count * record_struct.size, self.sample, op, flag, source, buffer, length, offset, rate,
+                                v0, v1, v2, v3, v4, v5)
+        self.count += 1
+
+    def grow(self) -> None:
+        if len(self.events) >= self.chunk_size:
+            self.flush()
+            return
+        events = np.zeros(min(len(self.events) * 2, self.chunk_size), dtype=event_dtype)
+        events[:self.count] = self.events[:self.count]
+        self.view.release()
+        self.events = events
+        self.view = memoryview(self.events.view(np.uint8))
+
+    def flush(self) -> None:
+        self.log_file.write(self.view[:self.count * record_struct.size])
+        self.log_file.flush()
+        self.count = 0
+
+    def get_source_handle(self, source) -> int:
+        handle = self.source_handles.get(id(source))
+        if handle is None:
+            handle = self.source_handles[id(source)] = len(self.source_handles)
+        return handle
+
+    def get_buffer_index(self, buffer) -> int:
+        index = self.buffer_indices.get(id(buffer))
+        if index is None:
+            name = next((name for name, sound_buffer in self.sound_buffers.items() if sound_buffer is buffer), f"buffer{len(self.sound_names)}")
+            index = self.buffer_indices[id(buffer)] = len(self.sound_names)
+            self.sound_names.append(name)
+        return index
+
+    def record_play(self, source, buffer, x: float, y: float, z: float, loop: bool) -> None:
+        self.record(EVENT_PLAY, self.get_source_handle(source), self.get_buffer_index(buffer), loop, x, y, z)
+
+    def record_stop(self, source) -> None:
+        self.record(EVENT_STOP, self.get_source_handle(source))
+
+    def record_position(self, source, x: float, y: float, z: float) -> None:
+        self.record(EVENT_POSITION, self.get_source_handle(source), 0, 0, x, y, z)
+
+    def record_gain(self, source, gain: float) -> None:
+        self.record(EVENT_GAIN, self.get_source_handle(source), 0, 0, gain)
+
+    def record_pitch(self, source, pitch: float) -> None:
+        self.record(EVENT_PITCH, self.get_source_handle(source), 0, 0, pitch)
+
+    def record_listener_position(self, x: float, y: float, z: float) -> None:
+        self.record(EVENT_LISTENER_POSITION, 0, 0, 0, x, y, z)
+
+    def record_listener_velocity(self, x: float, y: float, z: float) -> None:
+        self.record(EVENT_LISTENER_VELOCITY, 0, 0, 0, x, y, z)
+
+    def record_listener_orientation(self, x: float, y: float, z: float, x_up: float, y_up: float, z_up: float) -> None:
+        self.record(EVENT_LISTENER_ORIENTATION, 0, 0, 0, x, y, z, x_up, y_up, z_up)
+
+    def record_playback(self, source, format: int, audio_sample: bytes, sample_rate: int) -> None:
+        self.record(EVENT_PLAYBACK, self.get_source_handle(source), format, length=len(audio_sample), offset=self.payload_size, rate=sample_rate)
+        self.payload_file.write(audio_sample)
+        self.payload_size += len(audio_sample)
+
+    def close(self) -> None:
+        if self.log_file.closed:
+            return
+        self.flush()
+        self.log_file.close()
+        self.payload_file.close()
+        names_path = self.file_path.with_name(self.file_path.name + ".names.json")
+        names_path.write_text(json.dumps({"sound_names": self.sound_names, "samples": self.sample}))
+        self.view.release()
+
+
+def load_recording(file_path: Path) -> Tuple[np.ndarray, List[str], int, np.ndarray]:
+    # events, sound names, recorded samples and playback payload, as OfflineRenderer.render_to_* expects them
+    file_path = Path(file_path)
+    info = json.loads(file_path.with_name(file_path.name + ".names.json").read_text())
+    payload_path = file_path.with_name(file_path.name + ".payload")
+    payload = np.memmap(payload_path, dtype=np.uint8, mode="r") if payload_path.stat().st_size else np.zeros(0, dtype=np.uint8)
+    return load_events(file_path), info["sound_names"], info["samples"], payload
@@ -1,6 +1,13 @@
+import mmap
+import os
+import struct
+import threading
 import wave
+from collections import OrderedDict
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
 
 from fighting_sound.openal import al
 
@@ -11,8 +18,97 @@ formatmap = {
     (2, 16) : al.AL_FORMAT_STEREO16,
 }
 
+# bytes per sample frame of each uncompressed buffer format
+format_frame_sizes = {
+    al.AL_FORMAT_MONO8: 1,
+    al.AL_FORMAT_STEREO8: 2,
+    al.AL_FORMAT_MONO16: 2,
+    al.AL_FORMAT_STEREO16: 4,
+    al.AL_FORMAT_MONO_FLOAT32: 4,
+    al.AL_FORMAT_STEREO_FLOAT32: 8,
+    al.AL_FORMAT_MONO_DOUBLE_EXT: 8,
+    al.AL_FORMAT_STEREO_DOUBLE_EXT: 16,
+    al.AL_FORMAT_QUAD8: 4,
+    al.AL_FORMAT_QUAD16: 8,
+    al.AL_FORMAT_QUAD32: 16,
+    al.AL_FORMAT_51CHN8: 6,
+    al.AL_FORMAT_51CHN16: 12,
+    al.AL_FORMAT_51CHN32: 24,
+    al.AL_FORMAT_61CHN8: 7,
+    al.AL_FORMAT_61CHN16: 14,
+    al.AL_FORMAT_61CHN32: 28,
+    al.AL_FORMAT_71CHN8: 8,
+    al.AL_FORMAT_71CHN16: 16,
+    al.AL_FORMAT_71CHN32: 32,
+}
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# files at least this large are mapped instead of decoded into memory by default
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+def parse_wave_header(buf) -> Tuple[int, int, int, int, int]:
+    # returns (channels, bits per sample, sample rate, data offset, data size) of a RIFF/WAVE buffer
+    if len(buf) < 12 or buf[0:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(buf):
+        chunk_id = buf[offset:offset + 4]
+        chunk_size, = struct.unpack_from("<I", buf, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", buf, body)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAVE data chunk before fmt chunk")
+            audio_format, channels, samplerate, _, _, bits = fmt
+            if audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE):
+                raise ValueError(f"Unsupported WAVE format: {audio_format:#x}")
+            return channels, bits, samplerate, body, min(chunk_size, len(buf) - body)
+        offset = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAVE file has no data chunk")
+
+
+class MappedSound:
+    alformat: int
+    samplerate: int
+    size: int
+    data: np.ndarray
 
-def load_sound(file_path: Path) -> Tuple[int, bytes, int]:
+    def __init__(self, file_path: Path) -> None:
+        with open(file_path, 'rb') as fp:
+            self.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            channels, bits, self.samplerate, offset, self.size = parse_wave_header(self.mmap)
+            self.alformat = formatmap[(channels, bits)]
+        except Exception:
+            self.mmap.close()
+            raise
+        # read-only view of the data chunk, its address goes straight to alBufferData
+        self.data = np.frombuffer(self.mmap, dtype=np.uint8, count=self.size, offset=offset)
+
+    @property
+    def pointer(self) -> int:
+        return self.data.ctypes.data
+
+    def close(self) -> None:
+        if self.mmap is not None:
+            # the view holds an export of the mapping, it must go before the mapping can be closed
+            self.data = None
+            self.mmap.close()
+            self.mmap = None
+
+    def __enter__(self) -> "MappedSound":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def decode_sound(file_path: Path) -> Tuple[int, bytes, int]:
     with wave.open(str(file_path), 'rb') as wavefp:
         channels = wavefp.getnchannels()
         bitrate = wavefp.getsampwidth() * 8
@@ -20,3 +116,77 @@ def load_sound(file_path: Path) -> Tuple[int, bytes, int]:
         wavbuf = wavefp.readframes(wavefp.getnframes())
         alformat = formatmap[(channels, bitrate)]
     return alformat, wavbuf, samplerate
+
+
+def read_sound_format(file_path: Path) -> Tuple[int, int]:
+    # returns (alformat, samplerate) without reading the PCM
+    with wave.open(str(file_path), 'rb') as wavefp:
+        return formatmap[(wavefp.getnchannels(), wavefp.getsampwidth() * 8)], wavefp.getframerate()
+
+
+def list_sounds(sounds: Union[Path, Iterable[Path]]) -> List[Path]:
+    # a directory stands for the .wav files in it, in name order
+    if isinstance(sounds, (str, Path)):
+        sounds = sorted(path for path in Path(sounds).iterdir() if path.suffix.lower() == ".wav")
+    return [Path(path) for path in sounds]
+
+
+def iter_sound_chunks(file_path: Path, chunk_frames: int) -> Iterator[bytes]:
+    with wave.open(str(file_path), 'rb') as wavefp:
+        while True:
+            chunk = wavefp.readframes(chunk_frames)
+            if not chunk:
+                return
+            yield chunk
+
+
+class PCMCache:
+    max_bytes: int
+    nbytes: int
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        # resolved path -> ((mtime_ns, size), (alformat, wavbuf, samplerate)), least recently used first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, file_path: Path) -> Tuple[int, bytes, int]:
+        path = os.path.realpath(file_path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(path)
+                return entry[1]
+        sound = decode_sound(path)
+        with self.lock:
+            self.remove(path)
+            size = len(sound[1])
+            if size <= self.max_bytes:
+                self.entries[path] = (version, sound)
+                self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, (_, evicted) = self.entries.popitem(last=False)
+                    self.nbytes -= len(evicted[1])
+        return sound
+
+    def remove(self, path: str) -> None:
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.nbytes -= len(entry[1][1])
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+
+pcm_cache = PCMCache()
+
+
+def load_sound(file_path: Path, use_cache: bool = True) -> Tuple[int, bytes, int]:
+    if use_cache:
+        return pcm_cache.get(file_path)
+    return decode_sound(file_path)
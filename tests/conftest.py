@@ -0,0 +1,25 @@
+import pytest
+
+from fake_openal import FakeOpenAL
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils import openal as openal_utils
+
+
+@pytest.fixture
+def fake_openal(monkeypatch):
+    fake = FakeOpenAL()
+    fake.install(monkeypatch)
+    monkeypatch.setattr(openal_utils, "current_context", None)
+    openal_utils.thread_state.__dict__.pop("context", None)
+    yield fake
+    openal_utils.thread_local_contexts.clear()
+    openal_utils.thread_state.__dict__.pop("context", None)
+
+
+@pytest.fixture
+def sound_manager(fake_openal):
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer())
+    yield sound_manager
+    sound_manager.close()
@@ -0,0 +1,347 @@
+"""In-process stand-in for the OpenAL Soft library.
+
+Implements the AL/ALC entry points the package calls with the same ctypes
+argument conventions, and a plain mixer for loopback devices: every playing
+source adds its queued PCM times its gain to every output channel, ignoring
+position and sample rate. Calls on a source go through the current context,
+so a call on the wrong context fails like it would with the real library.
+"""
+import ctypes
+import threading
+
+import numpy as np
+
+from fighting_sound.openal import al, alc, soft
+
+pcm_formats = {
+    al.AL_FORMAT_MONO8: (np.uint8, 1),
+    al.AL_FORMAT_STEREO8: (np.uint8, 2),
+    al.AL_FORMAT_MONO16: (np.int16, 1),
+    al.AL_FORMAT_STEREO16: (np.int16, 2),
+    al.AL_FORMAT_MONO_FLOAT32: (np.float32, 1),
+    al.AL_FORMAT_STEREO_FLOAT32: (np.float32, 2),
+}
+
+output_dtypes = {
+    soft.ALC_SHORT_SOFT: np.int16,
+    soft.ALC_INT_SOFT: np.int32,
+    soft.ALC_FLOAT_SOFT: np.float32,
+}
+
+output_channels = {
+    soft.ALC_MONO_SOFT: 1,
+    soft.ALC_STEREO_SOFT: 2,
+}
+
+
+def value_of(arg):
+    return arg.value if hasattr(arg, "value") else int(arg)
+
+
+def read_ids(ids, n):
+    if isinstance(ids, ctypes.Array):
+        return list(ids[:n])
+    return [value_of(ids)]
+
+
+def write_ids(out, values):
+    if isinstance(out, ctypes.Array):
+        out[:len(values)] = values
+    else:
+        out.value = values[0]
+
+
+def to_float(data: bytes, alformat: int) -> np.ndarray:
+    dtype, channels = pcm_formats[alformat]
+    samples = np.frombuffer(data, dtype=dtype)
+    if dtype == np.uint8:
+        samples = (samples.astype(np.float32) - 128) / 128
+    elif dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768
+    return samples.reshape(-1, channels)
+
+
+class FakeDevice:
+    def __init__(self, loopback: bool) -> None:
+        self.pointer = ctypes.pointer(alc.ALCdevice())
+        self.loopback = loopback
+        self.buffers = {}
+        self.contexts = []
+        self.dtype = np.float32
+        self.nchannels = 2
+        self.sample_rate = 48000
+
+
+class FakeSource:
+    def __init__(self) -> None:
+        self.state = al.AL_INITIAL
+        self.queue = []
+        self.processed = 0
+        self.frame = 0
+        self.looping = False
+        self.gain = 1.0
+        self.attributes = {}
+
+
+class FakeContext:
+    def __init__(self, device: FakeDevice) -> None:
+        self.pointer = ctypes.pointer(alc.ALCcontext())
+        self.device = device
+        self.sources = {}
+        self.listener = {}
+
+
+class FakeOpenAL:
+    def __init__(self) -> None:
+        self.devices = {}
+        self.contexts = {}
+        self.current = None
+        self.thread_state = threading.local()
+        self.next_id = 1
+        self.calls = {}
+
+    # bookkeeping
+
+    def address(self, pointer) -> int:
+        return ctypes.cast(pointer, ctypes.c_void_p).value
+
+    def get_context(self) -> FakeContext:
+        context = getattr(self.thread_state, "context", None) or self.current
+        if context is None:
+            raise RuntimeError("no current context")
+        return context
+
+    def get_source(self, source_id) -> FakeSource:
+        return self.get_context().sources[value_of(source_id)]
+
+    def new_ids(self, n: int):
+        ids = list(range(self.next_id, self.next_id + n))
+        self.next_id += n
+        return ids
+
+    def count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    # ALC
+
+    def alcOpenDevice(self, name):
+        device = FakeDevice(False)
+        self.devices[self.address(device.pointer)] = device
+        return device.pointer
+
+    def alcLoopbackOpenDeviceSOFT(self, name):
+        device = FakeDevice(True)
+        self.devices[self.address(device.pointer)] = device
+        return device.pointer
+
+    def alcCloseDevice(self, device):
+        device = self.devices.pop(self.address(device))
+        assert not device.contexts, "device closed with live contexts"
+        return 1
+
+    def alcCreateContext(self, device, attrs):
+        device = self.devices[self.address(device)]
+        if attrs is not None:
+            attrs = list(attrs)
+            for attr, value in zip(attrs[0::2], attrs[1::2]):
+                if attr == soft.ALC_FORMAT_TYPE_SOFT:
+                    device.dtype = output_dtypes[value]
+                elif attr == soft.ALC_FORMAT_CHANNELS_SOFT:
+                    device.nchannels = output_channels[value]
+                elif attr == alc.ALC_FREQUENCY:
+                    device.sample_rate = value
+        context = FakeContext(device)
+        device.contexts.append(context)
+        self.contexts[self.address(context.pointer)] = context
+        return context.pointer
+
+    def lookup_context(self, pointer) -> FakeContext:
+        if not pointer:
+            return None
+        return self.contexts[self.address(pointer)]
+
+    def alcMakeContextCurrent(self, context):
+        self.count("alcMakeContextCurrent")
+        self.current = self.lookup_context(context)
+        self.thread_state.context = None
+        return 1
+
+    def alcSetThreadContext(self, context):
+        self.count("alcSetThreadContext")
+        self.thread_state.context = self.lookup_context(context)
+        return 1
+
+    def alcIsExtensionPresent(self, device, name):
+        return 1
+
+    def alcSuspendContext(self, context):
+        pass
+
+    def alcProcessContext(self, context):
+        pass
+
+    def alcDestroyContext(self, context):
+        context = self.contexts.pop(self.address(context))
+        context.device.contexts.remove(context)
+        if self.current is context:
+            self.current = None
+
+    def alcRenderSamplesSOFT(self, device, samples, nframes):
+        device = self.devices[self.address(device)]
+        assert device.loopback
+        nframes = value_of(nframes)
+        mix = np.zeros((nframes, device.nchannels), dtype=np.float32)
+        for context in device.contexts:
+            for source in context.sources.values():
+                if source.state == al.AL_PLAYING:
+                    self.mix_source(device, source, mix)
+        out = np.ctypeslib.as_array((np.ctypeslib.as_ctypes_type(device.dtype) * mix.size).from_address(samples))
+        if device.dtype == np.float32:
+            out[:] = mix.reshape(-1)
+        else:
+            scale = np.iinfo(device.dtype).max
+            out[:] = np.clip(np.round(mix.reshape(-1) * scale), -scale - 1, scale)
+
+    def mix_source(self, device: FakeDevice, source: FakeSource, mix: np.ndarray) -> None:
+        position = 0
+        while position < len(mix):
+            index = source.processed
+            if index >= len(source.queue):
+                if source.looping and source.queue:
+                    source.processed = 0
+                    continue
+                source.state = al.AL_STOPPED
+                return
+            pcm = device.buffers[source.queue[index]]
+            chunk = pcm[source.frame:source.frame + len(mix) - position]
+            if chunk.shape[1] > mix.shape[1]:
+                chunk = chunk.mean(axis=1, keepdims=True)
+            mix[position:position + len(chunk)] += chunk * source.gain
+            position += len(chunk)
+            source.frame += len(chunk)
+            if source.frame >= len(pcm):
+                source.frame = 0
+                source.processed += 1
+                if source.processed == len(source.queue) and not source.looping:
+                    source.state = al.AL_STOPPED
+                    return
+
+    # AL
+
+    def alGenSources(self, n, out):
+        ids = self.new_ids(value_of(n))
+        for source_id in ids:
+            self.get_context().sources[source_id] = FakeSource()
+        write_ids(out, ids)
+
+    def alDeleteSources(self, n, ids):
+        for source_id in read_ids(ids, value_of(n)):
+            del self.get_context().sources[source_id]
+
+    def alGenBuffers(self, n, out):
+        ids = self.new_ids(value_of(n))
+        for buffer_id in ids:
+            self.get_context().device.buffers[buffer_id] = np.zeros((0, 1), dtype=np.float32)
+        write_ids(out, ids)
+
+    def alDeleteBuffers(self, n, ids):
+        for buffer_id in read_ids(ids, value_of(n)):
+            del self.get_context().device.buffers[buffer_id]
+
+    def alBufferData(self, buffer_id, alformat, data, size, sample_rate):
+        buffers = self.get_context().device.buffers
+        buffer_id = value_of(buffer_id)
+        assert buffer_id in buffers
+        data = ctypes.string_at(data, size) if isinstance(data, int) else bytes(data)[:size]
+        buffers[buffer_id] = to_float(data, alformat)
+
+    def alSourcei(self, source_id, param, value):
+        source = self.get_source(source_id)
+        value = value_of(value)
+        if param == al.AL_BUFFER:
+            source.queue = [value] if value else []
+            source.processed = 0
+            source.frame = 0
+            source.state = al.AL_INITIAL
+        elif param == al.AL_LOOPING:
+            source.looping = bool(value)
+        else:
+            source.attributes[param] = value
+
+    def alSourcef(self, source_id, param, value):
+        source = self.get_source(source_id)
+        if param == al.AL_GAIN:
+            source.gain = float(value)
+        source.attributes[param] = float(value)
+
+    def alSource3f(self, source_id, param, x, y, z):
+        self.get_source(source_id).attributes[param] = (float(x), float(y), float(z))
+
+    def alSource3i(self, source_id, param, x, y, z):
+        self.get_source(source_id).attributes[param] = (int(x), int(y), int(z))
+
+    def alSourcefv(self, source_id, param, values):
+        self.get_source(source_id).attributes[param] = tuple(values[:3])
+
+    def alSourceiv(self, source_id, param, values):
+        self.get_source(source_id).attributes[param] = tuple(values[:3])
+
+    def alGetSourcei(self, source_id, param, out):
+        source = self.get_source(source_id)
+        if param == al.AL_SOURCE_STATE:
+            out.value = source.state
+        elif param == al.AL_BUFFERS_PROCESSED:
+            out.value = source.processed if source.state != al.AL_INITIAL else 0
+        elif param == al.AL_BUFFERS_QUEUED:
+            out.value = len(source.queue)
+        else:
+            out.value = source.attributes.get(param, 0)
+
+    def alListenerfv(self, param, values):
+        self.get_context().listener[param] = list(values)
+
+    def alSourcePlay(self, source_id):
+        source = self.get_source(source_id)
+        if source.state != al.AL_PLAYING:
+            source.processed = 0
+            source.frame = 0
+        source.state = al.AL_PLAYING if source.queue else al.AL_STOPPED
+
+    def alSourcePlayv(self, n, ids):
+        for source_id in read_ids(ids, value_of(n)):
+            self.alSourcePlay(source_id)
+
+    def alSourceStop(self, source_id):
+        source = self.get_source(source_id)
+        source.state = al.AL_STOPPED
+        source.processed = len(source.queue)
+        source.frame = 0
+
+    def alSourceStopv(self, n, ids):
+        for source_id in read_ids(ids, value_of(n)):
+            self.alSourceStop(source_id)
+
+    def alSourceQueueBuffers(self, source_id, n, ids):
+        source = self.get_source(source_id)
+        source.queue.extend(read_ids(ids, value_of(n)))
+
+    def alSourceUnqueueBuffers(self, source_id, n, out):
+        source = self.get_source(source_id)
+        n = value_of(n)
+        assert n <= source.processed, "unqueued a pending buffer"
+        write_ids(out, source.queue[:n])
+        del source.queue[:n]
+        source.processed -= n
+
+    def install(self, monkeypatch) -> None:
+        # through the module dicts, so the optional functions are not looked up in the real library first
+        for name in dir(self):
+            if name.endswith("SOFT"):
+                module = soft
+            elif name.startswith("alc"):
+                module = alc
+            elif name.startswith("al") and name[2].isupper():
+                module = al
+            else:
+                continue
+            monkeypatch.setitem(vars(module), name, getattr(self, name))
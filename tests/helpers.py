@@ -0,0 +1,18 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+
+
+def write_wave(file_path: Path, pcm: np.ndarray, sample_rate: int = 48000) -> Path:
+    # pcm is interleaved (nsamples, nchannels) int16 or uint8
+    with wave.open(str(file_path), "wb") as wavefp:
+        wavefp.setnchannels(pcm.shape[1])
+        wavefp.setsampwidth(pcm.dtype.itemsize)
+        wavefp.setframerate(sample_rate)
+        wavefp.writeframes(np.ascontiguousarray(pcm).tobytes())
+    return Path(file_path)
+
+
+def ramp(nsamples: int, nchannels: int = 1, start: int = 0) -> np.ndarray:
+    return (np.arange(nsamples * nchannels, dtype=np.int64) + start).astype(np.int16).reshape(nsamples, nchannels)
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from fighting_sound.async_sound_manager import AsyncSoundManager
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED
+
+
+def create_sound_manager() -> SoundManager:
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer())
+    pcm = np.full(4800, 0.25, dtype=np.float32).tobytes()
+    sound_manager.upload_sounds(["hit.wav"], [(al.AL_FORMAT_MONO_FLOAT32, pcm, len(pcm), 48000)])
+    return sound_manager
+
+
+@pytest.fixture
+def async_sound_manager(fake_openal):
+    async_sound_manager = AsyncSoundManager(create_sound_manager)
+    # (thread, batch size) of every hop back to the event loop
+    async_sound_manager.batches = []
+    resolve = async_sound_manager.resolve
+
+    def record_batch(batch):
+        async_sound_manager.batches.append((threading.current_thread(), len(batch)))
+        resolve(batch)
+
+    async_sound_manager.resolve = record_batch
+    return async_sound_manager
+
+
+def test_concurrent_calls_are_batched(async_sound_manager, fake_openal):
+    async def main():
+        await async_sound_manager.start()
+        sources = await asyncio.gather(*(async_sound_manager.create_audio_source() for _ in range(4)))
+        hit = async_sound_manager.sound_manager.get_sound_buffer("hit.wav")
+        async_sound_manager.batches.clear()
+        await asyncio.gather(*(async_sound_manager.play(source, hit, 0, 0, False) for source in sources))
+        batches = list(async_sound_manager.batches)
+        audio = await async_sound_manager.sample_audio(render_size=100, layout=LAYOUT_INTERLEAVED)
+        await async_sound_manager.close()
+        return sources, batches, audio
+
+    sources, batches, audio = asyncio.run(main())
+    assert len({id(source) for source in sources}) == 4
+    # four plays, one hop to the audio thread and one back
+    assert batches == [(threading.main_thread(), 4)]
+    np.testing.assert_allclose(audio, 1.0)
+
+
+def test_exceptions_reach_the_awaiting_coroutine(async_sound_manager):
+    def fail():
+        raise ValueError("no such sound")
+
+    async def main():
+        await async_sound_manager.start()
+        try:
+            ok = async_sound_manager.submit(lambda: "ok")
+            with pytest.raises(ValueError, match="no such sound"):
+                await async_sound_manager.submit(fail)
+            # a failing call does not take the rest of its batch down
+            return await ok
+        finally:
+            await async_sound_manager.close()
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_frames(async_sound_manager):
+    async def main():
+        await async_sound_manager.start()
+        frames = []
+        iterator = async_sound_manager.frames(render_size=160, interval=0.001)
+        async for frame in iterator:
+            frames.append(frame)
+            if len(frames) == 3:
+                break
+        await iterator.aclose()
+        await async_sound_manager.close()
+        return frames
+
+    frames = asyncio.run(main())
+    assert [frame.shape for frame in frames] == [(2, 160)] * 3
+    assert all(frame.dtype == np.float32 for frame in frames)
+
+
+def test_close_joins_the_audio_thread(async_sound_manager, fake_openal):
+    async def main():
+        await async_sound_manager.start()
+        thread = async_sound_manager.thread
+        await async_sound_manager.close()
+        await async_sound_manager.close()
+        return thread
+
+    thread = asyncio.run(main())
+    assert not thread.is_alive() and async_sound_manager.thread is None
+    assert not fake_openal.devices
+    with pytest.raises(RuntimeError):
+        asyncio.run(async_sound_manager.create_audio_source())
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fighting_sound.utils.audio_frame_ring import AudioFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = AudioFrameRing.create(3, (4, 2))
+    yield ring
+    ring.close()
+
+
+def test_write_and_read(ring):
+    reader = AudioFrameRing.attach(ring.name)
+    try:
+        assert reader.frame_shape == (4, 2) and reader.slots == 3
+        assert reader.latest() == (0, None)
+        assert ring.write(np.full((4, 2), 1.0)) == 1
+        seq = ring.write(np.full((4, 2), 2.0))
+        latest_seq, frame = reader.latest()
+        assert latest_seq == seq == 2
+        np.testing.assert_array_equal(frame, 2.0)
+        np.testing.assert_array_equal(reader.read_copy(1), 1.0)
+        assert reader.read(3) is None
+    finally:
+        reader.close()
+
+
+def test_frames_being_written_are_not_readable(ring):
+    out = ring.begin_write()
+    out[...] = 5.0
+    assert ring.read(1) is None
+    assert ring.commit() == 1
+    np.testing.assert_array_equal(ring.read(1), 5.0)
+
+
+def test_overrun_invalidates_old_frames(ring):
+    for i in range(1, 5):
+        ring.write(np.full((4, 2), float(i)))
+    # frame 4 went into frame 1's slot
+    assert ring.read(1) is None and ring.read_copy(1) is None
+    np.testing.assert_array_equal(ring.read(2), 2.0)
+    view = ring.read(2)
+    ring.write(np.full((4, 2), 5.0))
+    assert not ring.is_valid(2)
+    np.testing.assert_array_equal(view, 5.0)
+
+
+def test_attach_rejects_other_shared_memory():
+    from multiprocessing.shared_memory import SharedMemory
+    shm = SharedMemory(create=True, size=256)
+    try:
+        with pytest.raises(ValueError):
+            AudioFrameRing.attach(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
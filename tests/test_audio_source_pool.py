@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fighting_sound.models.audio_source_pool import STEAL_OLDEST, STEAL_QUIETEST, AudioSourcePool
+from fighting_sound.openal import al
+
+
+@pytest.fixture
+def hit(sound_manager):
+    pcm = np.full(4800, 1000, dtype=np.int16).tobytes()
+    return sound_manager.upload_sounds(["hit.wav"], [(al.AL_FORMAT_MONO16, pcm, len(pcm), 48000)])["hit.wav"]
+
+
+def test_finished_voices_are_reused(sound_manager, hit):
+    pool = AudioSourcePool(sound_manager, 2)
+    first = pool.play(hit, 0, 0)
+    second = pool.play(hit, 0, 0)
+    assert first is not second
+    sound_manager.sample_audio(render_size=4800)
+    assert pool.play(hit, 0, 0) in (first, second)
+    assert pool.steal_count == 0
+
+
+@pytest.mark.parametrize("steal_policy", [STEAL_OLDEST, STEAL_QUIETEST])
+def test_voices_started_in_a_deferred_frame_are_not_reclaimed(sound_manager, hit, steal_policy):
+    pool = AudioSourcePool(sound_manager, 2, steal_policy)
+    sound_manager.begin_frame()
+    first = pool.play(hit, 0, 0, gain=0.5)
+    second = pool.play(hit, 0, 0, gain=1.0)
+    third = pool.play(hit, 0, 0, gain=1.0)
+    assert first is not second
+    assert pool.steal_count == 1
+    # the stolen voice is the oldest or the quietest one, either way the first
+    assert third is first
+    sound_manager.commit_frame()
+    assert sound_manager.are_playing([first, second]) == [True, True]
+
+
+def test_quietest_voice_follows_gain_changes(sound_manager, hit):
+    pool = AudioSourcePool(sound_manager, 2, STEAL_QUIETEST)
+    first = pool.play(hit, 0, 0, gain=0.5)
+    second = pool.play(hit, 0, 0, gain=1.0)
+    pool.set_gain(first, 1.0)
+    pool.set_gain(second, 0.25)
+    assert pool.play(hit, 0, 0) is second
+    assert pool.steal_count == 1
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from helpers import ramp, write_wave
+from fighting_sound.openal import al
+from fighting_sound.utils.bank import BANK_ALIGNMENT, SoundBank, pack_sound_bank
+
+
+def test_pack_and_load_round_trip(tmp_path):
+    sounds = tmp_path / "sounds"
+    sounds.mkdir()
+    write_wave(sounds / "b.wav", ramp(101, 2), 44100)
+    write_wave(sounds / "a.wav", ramp(33, 1, 1000), 48000)
+    (sounds / "notes.txt").write_text("not a sound")
+
+    assert pack_sound_bank(sounds, tmp_path / "sounds.bank") == 2
+    with SoundBank(tmp_path / "sounds.bank") as bank:
+        assert bank.names() == ["a.wav", "b.wav"]
+        alformat, pointer, size, samplerate = bank.get_sound("b.wav")
+        assert (alformat, size, samplerate) == (al.AL_FORMAT_STEREO16, ramp(101, 2).nbytes, 44100)
+        assert pointer % BANK_ALIGNMENT == bank.data.ctypes.data % BANK_ALIGNMENT
+        offset = pointer - bank.data.ctypes.data
+        np.testing.assert_array_equal(bank.data[offset:offset + size].view(np.int16).reshape(-1, 2), ramp(101, 2))
+        alformat, pointer, size, samplerate = bank.get_sound("a.wav")
+        offset = pointer - bank.data.ctypes.data
+        assert alformat == al.AL_FORMAT_MONO16
+        np.testing.assert_array_equal(bank.data[offset:offset + size].view(np.int16), ramp(33, 1, 1000).ravel())
+
+
+def test_load_rejects_other_files(tmp_path):
+    (tmp_path / "bogus.bank").write_bytes(b"RIFF" + bytes(60))
+    with pytest.raises(ValueError):
+        SoundBank(tmp_path / "bogus.bank")
+
+
+def test_load_rejects_truncated_bank(tmp_path):
+    write_wave(tmp_path / "a.wav", ramp(1000), 48000)
+    pack_sound_bank([tmp_path / "a.wav"], tmp_path / "sounds.bank")
+    data = (tmp_path / "sounds.bank").read_bytes()
+    (tmp_path / "sounds.bank").write_bytes(data[:-10])
+    with pytest.raises(ValueError):
+        SoundBank(tmp_path / "sounds.bank")
+
+
+def test_sound_manager_loads_a_directory_or_a_bank(tmp_path, sound_manager):
+    write_wave(tmp_path / "a.wav", ramp(100), 48000)
+    pack_sound_bank(tmp_path, tmp_path / "sounds.bank")
+    from_directory = sound_manager.load_sounds(tmp_path)["a.wav"]
+    from_bank = sound_manager.load_sounds(tmp_path / "sounds.bank")["a.wav"]
+    assert from_bank is not from_directory
@@ -0,0 +1,24 @@
+import importlib.util
+import json
+from pathlib import Path
+
+from fighting_sound import openal
+
+
+def load_benchmarks():
+    path = Path(__file__).parent.parent / "benchmarks" / "bench_sound_manager.py"
+    spec = importlib.util.spec_from_file_location("bench_sound_manager", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_suite_writes_a_report(tmp_path, fake_openal, monkeypatch):
+    monkeypatch.setattr(openal, "get_dll_file", lambda: "fake")
+    load_benchmarks().main(["--repeat", "1", "--output", str(tmp_path / "bench.json")])
+    report = json.loads((tmp_path / "bench.json").read_text())
+    assert report["meta"]["repeat"] == 1
+    names = {result["name"] for result in report["results"]}
+    assert names == {"sample_audio", "sample_audio_batch", "create_audio_buffer", "play", "play3d", "set_source_pos3d",
+                     "playback"}
+    assert not fake_openal.devices
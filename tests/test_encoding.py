@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al, soft
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.encoding import (ENCODING_INT16, ENCODING_INT16_ZLIB, ENCODING_RAW, EncodingProfile, decode_audio,
+                                           encode_audio)
+
+
+def tone(nsamples: int = 960) -> np.ndarray:
+    t = np.arange(nsamples) / 48000
+    return np.stack((np.sin(2 * np.pi * 440 * t), 0.5 * np.sin(2 * np.pi * 660 * t))).astype(np.float32)
+
+
+@pytest.mark.parametrize("encoding", [ENCODING_INT16, ENCODING_INT16_ZLIB])
+@pytest.mark.parametrize("delta", [False, True])
+def test_int16_round_trip(encoding, delta):
+    audio = tone()
+    decoded, sample_rate = decode_audio(encode_audio(audio, EncodingProfile(encoding, delta=delta), 48000))
+    assert sample_rate == 48000 and decoded.dtype == np.int16
+    np.testing.assert_array_equal(decoded, np.rint(audio * 32767).astype(np.int16))
+
+
+def test_delta_coding_survives_int16_wraparound():
+    audio = np.array([[32767, -32768, 32767, -32768, 0]], dtype=np.int16)
+    decoded, _ = decode_audio(encode_audio(audio, EncodingProfile(ENCODING_INT16_ZLIB, delta=True)))
+    np.testing.assert_array_equal(decoded, audio)
+
+
+def test_zlib_compresses_delta_coded_audio():
+    audio = tone(48000)
+    packed = encode_audio(audio, EncodingProfile(ENCODING_INT16_ZLIB))
+    assert len(packed) < len(encode_audio(audio, EncodingProfile(ENCODING_INT16)))
+
+
+def test_raw_round_trip_with_mono_and_downsample():
+    audio = tone()
+    decoded, sample_rate = decode_audio(encode_audio(audio, EncodingProfile(ENCODING_RAW, mono=True, downsample=4), 48000))
+    assert sample_rate == 12000
+    np.testing.assert_allclose(decoded, audio.mean(axis=0).reshape(1, -1, 4).mean(axis=-1), rtol=1e-6)
+
+
+def test_int16_input_is_scaled_before_downmix():
+    audio = np.rint(tone() * 32767).astype(np.int16)
+    decoded, _ = decode_audio(encode_audio(audio, EncodingProfile(ENCODING_INT16, mono=True, delta=False)))
+    np.testing.assert_allclose(decoded[0], audio.mean(axis=0), atol=1)
+
+
+@pytest.mark.parametrize("dtype, convert", [
+    (np.int32, lambda pcm: pcm.astype(np.int32) << 16),
+    (np.uint8, lambda pcm: ((pcm >> 8) + 128).astype(np.uint8)),
+    (np.uint16, lambda pcm: (pcm.astype(np.int32) + 32768).astype(np.uint16)),
+])
+@pytest.mark.parametrize("mono", [False, True])
+def test_other_integer_formats_are_rescaled(dtype, convert, mono):
+    pcm = np.rint(tone() * 32767).astype(np.int16)
+    if dtype == np.uint8:
+        pcm &= ~0xFF
+    audio = convert(pcm)
+    assert audio.dtype == dtype
+    decoded, _ = decode_audio(encode_audio(audio, EncodingProfile(ENCODING_INT16, mono=mono)))
+    expected = pcm if not mono else pcm.mean(axis=0, keepdims=True)
+    np.testing.assert_allclose(decoded, expected, atol=1)
+
+
+def test_non_pcm_types_are_rejected():
+    with pytest.raises(ValueError):
+        encode_audio(np.zeros((2, 10), dtype=np.complex64), EncodingProfile(ENCODING_INT16))
+
+
+def test_renderer_created_for_a_profile(fake_openal):
+    profile = EncodingProfile(ENCODING_INT16, mono=True, delta=False)
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer_for_profile(profile))
+    renderer = sound_manager.virtual_renderer
+    assert (renderer.format, renderer.channel) == (soft.ALC_SHORT_SOFT, soft.ALC_MONO_SOFT)
+    pcm = np.full(100, 0.25, dtype=np.float32).tobytes()
+    hit = sound_manager.upload_sounds(["hit.wav"], [(al.AL_FORMAT_MONO_FLOAT32, pcm, len(pcm), 48000)])["hit.wav"]
+    sound_manager.play(sound_manager.create_audio_source(), hit, 0, 0, False)
+    packed, = sound_manager.sample_audio_encoded([profile], render_size=100)
+    decoded, sample_rate = decode_audio(packed)
+    assert sample_rate == 48000
+    np.testing.assert_array_equal(decoded, np.full((1, 100), 8192, dtype=np.int16))
+    sound_manager.close()
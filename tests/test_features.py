@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from fighting_sound.utils.features import FeatureExtractor, mel_filterbank
+
+
+def test_mel_filterbank_shape():
+    filters = mel_filterbank(48000, 1024, 40)
+    assert filters.shape == (40, 513)
+    assert filters.min() >= 0 and np.all(filters.max(axis=1) > 0)
+
+
+@pytest.mark.parametrize("block_size", [800, 333, 4000])
+def test_streaming_matches_a_single_pass(block_size):
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal((2, 12000)).astype(np.float32)
+    single = FeatureExtractor(n_fft=1024, hop_length=400).process(audio)
+
+    extractor = FeatureExtractor(n_fft=1024, hop_length=400)
+    blocks = [extractor.process(audio[:, start:start + block_size]) for start in range(0, audio.shape[1], block_size)]
+    for name in ("spectrogram", "mel", "energy"):
+        streamed = np.concatenate([block[name] for block in blocks], axis=1)
+        assert streamed.shape == single[name].shape
+        np.testing.assert_allclose(streamed, single[name], rtol=1e-5, atol=1e-5)
+
+
+def test_short_blocks_yield_no_frames():
+    extractor = FeatureExtractor(n_fft=1024, hop_length=400, n_mels=32)
+    features = extractor.process(np.zeros((2, 500), dtype=np.float32))
+    assert features["mel"].shape == (2, 0, 32)
+    assert extractor.process(np.zeros((2, 600), dtype=np.float32))["mel"].shape == (2, 1, 32)
@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+import pytest
+
+from helpers import ramp, write_wave
+from fighting_sound.models import file_stream as file_stream_module
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED
+
+
+def update_until_done(sound_manager: SoundManager, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while sound_manager.file_streams:
+        assert time.monotonic() < deadline, "stream never finished"
+        sound_manager.update_streams()
+        time.sleep(0.001)
+
+
+def test_stream_whole_file(tmp_path, sound_manager):
+    pcm = ramp(2000, 2)
+    write_wave(tmp_path / "music.wav", pcm, 8000)
+    source = sound_manager.create_audio_source()
+    sound_manager.stream_buffers = 32
+    sound_manager.stream_file(source, tmp_path / "music.wav", chunk_ms=50)
+    update_until_done(sound_manager)
+    audio = sound_manager.sample_audio(render_size=2000, layout=LAYOUT_INTERLEAVED)
+    np.testing.assert_allclose(audio, pcm / 32768)
+
+
+def test_decoder_error_is_raised_by_update(tmp_path, sound_manager, monkeypatch):
+    write_wave(tmp_path / "music.wav", ramp(2000), 8000)
+
+    def broken_chunks(file_path, chunk_frames):
+        yield bytes(2 * chunk_frames)
+        raise OSError("disk went away")
+
+    monkeypatch.setattr(file_stream_module, "iter_sound_chunks", broken_chunks)
+    source = sound_manager.create_audio_source()
+    file_stream = sound_manager.stream_file(source, tmp_path / "music.wav")
+    with pytest.raises(OSError, match="disk went away"):
+        update_until_done(sound_manager)
+    assert file_stream.finished and not sound_manager.file_streams
+    assert not file_stream.update()
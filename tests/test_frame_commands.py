@@ -0,0 +1,33 @@
+from fighting_sound.models.frame_commands import FrameCommands
+from fighting_sound.openal import al
+
+
+class Source:
+    pass
+
+
+def test_last_write_of_a_frame_wins():
+    commands = FrameCommands()
+    source, other = Source(), Source()
+    commands.set_source_attribute(source, al.AL_GAIN, 0.5)
+    commands.set_source_attribute(source, al.AL_POSITION, [1.0, 0.0, 0.0])
+    commands.set_source_attribute(source, al.AL_GAIN, 0.25)
+    commands.set_source_attribute(other, al.AL_GAIN, 1.0)
+    commands.set_listener_attribute(al.AL_POSITION, [0.0, 0.0, 0.0])
+    commands.set_listener_attribute(al.AL_POSITION, [1.0, 2.0, 3.0])
+    assert len(commands) == 4
+    assert commands.source_attributes[(id(source), al.AL_GAIN)] == (source, al.AL_GAIN, 0.25)
+    assert commands.listener_attributes == {al.AL_POSITION: [1.0, 2.0, 3.0]}
+
+
+def test_play_and_stop_coalesce_per_source():
+    commands = FrameCommands()
+    source, other = Source(), Source()
+    commands.play(source, "hit", False)
+    commands.stop(source)
+    commands.play(other, "hit", True)
+    commands.stop(other)
+    commands.play(other, "kick", False)
+    assert commands.source_actions == {id(source): (source, None, False), id(other): (other, "kick", False)}
+    commands.clear()
+    assert len(commands) == 0
@@ -0,0 +1,75 @@
+import wave
+
+import numpy as np
+import pytest
+
+from helpers import write_wave
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.offline_renderer import OfflineRenderer
+from fighting_sound.openal import al
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.events import event_dtype
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED
+from fighting_sound.utils.recorder import load_recording
+
+
+@pytest.fixture
+def sounds(tmp_path):
+    sounds = tmp_path / "sounds"
+    sounds.mkdir()
+    t = np.arange(2000)
+    write_wave(sounds / "hit.wav", (np.sin(t / 7) * 12000).astype(np.int16)[:, None])
+    write_wave(sounds / "kick.wav", (np.sin(t / 3) * 8000).astype(np.int16).repeat(2).reshape(-1, 2))
+    return sounds
+
+
+def record_match(sounds, log_path) -> np.ndarray:
+    # plays a short match live while recording it, returns what the live renderer produced
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer())
+    sound_manager.load_sound_bank(sounds)
+    sound_manager.start_recording(log_path)
+    player, enemy, voice = (sound_manager.create_audio_source() for _ in range(3))
+    hit, kick = sound_manager.get_sound_buffer("hit.wav"), sound_manager.get_sound_buffer("kick.wav")
+    chunk = (np.cos(np.arange(700) / 5) * 0.25).astype(np.float32)
+    frames = []
+    for frame in range(8):
+        if frame == 0:
+            sound_manager.play(player, hit, 0.0, 0.0, False)
+        if frame == 2:
+            sound_manager.set_source_gain(player, 0.5)
+            sound_manager.play3d(enemy, kick, 1.0, 0.0, 0.0, True)
+            sound_manager.playback(voice, al.AL_FORMAT_MONO_FLOAT32, chunk.tobytes(), 48000)
+        if frame == 5:
+            sound_manager.stop(enemy)
+            sound_manager.set_listener_position(0.0, 1.0, 0.0)
+        frames.append(sound_manager.sample_audio(render_size=800, layout=LAYOUT_INTERLEAVED).copy())
+    sound_manager.close()
+    return np.concatenate(frames)
+
+
+def test_recorded_match_renders_offline_like_it_played_live(tmp_path, sounds, fake_openal):
+    live = record_match(sounds, tmp_path / "match.events")
+    assert np.abs(live).max() > 0.2
+    events, sound_names, total_samples, payload = load_recording(tmp_path / "match.events")
+    assert total_samples == len(live) == 6400
+
+    renderer = OfflineRenderer(sounds, sound_names, block_size=1000)
+    rendered = renderer.render_to_memmap(events, total_samples, tmp_path / "match.f32", payload)
+    np.testing.assert_allclose(rendered, live, atol=1e-6)
+
+    renderer.render_to_wave(events, total_samples, tmp_path / "match.wav", payload)
+    with wave.open(str(tmp_path / "match.wav"), "rb") as wavefp:
+        assert (wavefp.getnchannels(), wavefp.getnframes()) == (2, total_samples)
+        pcm = np.frombuffer(wavefp.readframes(total_samples), dtype=np.int16).reshape(-1, 2)
+    np.testing.assert_allclose(pcm, np.rint(live * 32767), atol=1)
+    assert not fake_openal.devices
+
+
+def test_teardown_failure_does_not_fail_the_render(tmp_path, sounds, fake_openal, monkeypatch):
+    def broken_close(self):
+        raise RuntimeError("teardown failed")
+
+    monkeypatch.setattr(SoundManager, "close", broken_close)
+    rendered = OfflineRenderer(sounds, ["hit.wav"]).render_to_memmap(np.zeros(0, dtype=event_dtype), 100, tmp_path / "silence.f32")
+    np.testing.assert_array_equal(rendered, 0.0)
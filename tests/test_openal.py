@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from fighting_sound import openal
+
+libnames = {"win32": ["OpenAL32"], "DEFAULT": ["openal", "OpenAL"]}
+
+
+@pytest.fixture
+def find_library(monkeypatch):
+    monkeypatch.setattr(openal.sys, "platform", "linux")
+    searched = []
+
+    def find_library(libname):
+        searched.append(libname)
+        return f"/usr/lib/lib{libname}.so.1"
+
+    monkeypatch.setattr(openal, "find_library", find_library)
+    return searched
+
+
+def test_findlib_explicit_file(tmp_path, find_library):
+    libfile = tmp_path / "custom-openal.so"
+    libfile.write_bytes(b"")
+    assert openal._findlib(libnames, str(libfile)) == [str(libfile)]
+    assert not find_library
+
+
+def test_findlib_explicit_directory_skips_find_library(tmp_path, find_library):
+    (tmp_path / "openal.so").write_bytes(b"")
+    assert openal._findlib(libnames, str(tmp_path), "/elsewhere") == [os.path.join(tmp_path, "openal.so")]
+    assert openal._findlib(libnames, str(tmp_path / "missing")) == []
+    assert not find_library
+
+
+def test_findlib_without_path_searches_then_asks_find_library(tmp_path, find_library):
+    (tmp_path / "OpenAL.so").write_bytes(b"")
+    assert openal._findlib(libnames, None, str(tmp_path)) == [
+        os.path.join(tmp_path, "OpenAL.so"), "/usr/lib/libopenal.so.1", "/usr/lib/libOpenAL.so.1"]
+    assert find_library == ["openal", "OpenAL"]
+
+
+def test_set_path_after_loading_raises():
+    dll = openal._DLL("OpenAL", libnames)
+    dll.set_path("/opt/openal")
+    assert dll._path == "/opt/openal"
+    dll._dll, dll._libfile = object(), "/usr/lib/libopenal.so.1"
+    with pytest.raises(RuntimeError, match="already loaded"):
+        dll.set_path("/opt/other")
+
+
+def run_python(code: str, **env) -> str:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path), **env)
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+
+def test_import_does_not_open_the_library(tmp_path):
+    code = (
+        "import ctypes\n"
+        "def refuse(*args, **kwargs): raise AssertionError('library opened on import')\n"
+        "ctypes.CDLL = refuse\n"
+        "from fighting_sound.openal import al, alc, soft\n"
+        "from fighting_sound import openal, sound_manager\n"
+        "print(openal.dll._dll is None, openal.dll._path)\n"
+    )
+    assert run_python(code, PYAL_DLL_PATH=str(tmp_path)).split() == ["True", str(tmp_path)]
+
+
+def test_first_call_loads_from_pyal_dll_path(tmp_path):
+    code = (
+        "import ctypes.util\n"
+        "ctypes.util.find_library = lambda name: '/nonexistent/libopenal.so'\n"
+        "from fighting_sound.openal import alc\n"
+        "try:\n"
+        "    alc.alcOpenDevice(None)\n"
+        "except RuntimeError as exc:\n"
+        "    print(exc)\n"
+    )
+    # an explicit directory without the library fails instead of falling back to find_library
+    assert run_python(code, PYAL_DLL_PATH=str(tmp_path)).strip() == "could not find any library for OpenAL"
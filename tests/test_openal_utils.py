@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al
+from fighting_sound.utils.openal import set_source_attribute
+
+
+@pytest.fixture
+def source(fake_openal):
+    renderer = SoundRenderer.create_virtual_renderer()
+    source_id = renderer.create_source({})
+    yield fake_openal.get_source(source_id), source_id
+    renderer.close()
+
+
+@pytest.mark.parametrize("value", [
+    [1.0, 2.0, 3.0],
+    np.array([1, 2, 3], dtype=np.float32),
+    np.array([1, 2, 3], dtype=np.float64),
+    # every other element of a float32 array, not contiguous
+    np.array([1, 0, 2, 0, 3, 0], dtype=np.float32)[::2],
+])
+def test_set_source_vector(source, value):
+    fake_source, source_id = source
+    set_source_attribute(source_id, al.AL_POSITION, value)
+    assert fake_source.attributes[al.AL_POSITION] == (1.0, 2.0, 3.0)
+
+
+def test_set_source_vector_passes_float32_arrays_by_pointer(source, monkeypatch):
+    fake_source, source_id = source
+    calls = []
+    monkeypatch.setitem(vars(al), "alSource3f", lambda *args: calls.append(args))
+    set_source_attribute(source_id, al.AL_VELOCITY, np.array([4, 5, 6], dtype=np.float32))
+    assert not calls
+    assert fake_source.attributes[al.AL_VELOCITY] == (4.0, 5.0, 6.0)
+
+
+def test_source_setters_dispatch_by_attribute(source):
+    fake_source, source_id = source
+    # ints for float attributes and the other way round are converted by the setter's argument type
+    set_source_attribute(source_id, al.AL_GAIN, 1)
+    set_source_attribute(source_id, al.AL_LOOPING, True)
+    set_source_attribute(source_id, al.AL_SOURCE_RELATIVE, al.AL_TRUE)
+    assert fake_source.gain == 1.0 and isinstance(fake_source.attributes[al.AL_GAIN], float)
+    assert fake_source.looping
+    assert fake_source.attributes[al.AL_SOURCE_RELATIVE] == al.AL_TRUE
+
+
+def test_attributes_without_a_setter_go_by_value_type(source):
+    fake_source, source_id = source
+    attr = 0x20001
+    set_source_attribute(source_id, attr, 0.5)
+    assert fake_source.attributes[attr] == 0.5
+    set_source_attribute(source_id, attr, [1, 2, 3])
+    assert fake_source.attributes[attr] == (1, 2, 3)
+    with pytest.raises(ValueError):
+        set_source_attribute(source_id, attr, "loud")
@@ -0,0 +1,97 @@
+import logging
+import types
+
+import pytest
+
+from fighting_sound import openal
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils.profiling import MethodProfiler
+
+
+@pytest.fixture
+def dll(monkeypatch):
+    # a library that is never opened, with one function bound by hand
+    dll = openal._DLL("OpenAL", {"DEFAULT": ["openal"]})
+    monkeypatch.setattr(openal, "dll", dll)
+    return dll
+
+
+def alFake(value):
+    if value < 0:
+        raise ValueError("negative")
+    return value * 2
+
+
+def test_profiled_function_counts_calls_and_errors(dll):
+    wrapper = dll._profiled("alFake", alFake)
+    assert wrapper.__name__ == "alFake" and wrapper.__wrapped__ is alFake
+    assert wrapper(2) == 4
+    with pytest.raises(ValueError):
+        wrapper(-1)
+    calls, seconds = openal.get_call_stats()["alFake"]
+    assert calls == 2 and seconds >= 0
+    openal.reset_call_stats()
+    assert openal.get_call_stats() == {}
+
+
+def test_set_profiling_swaps_bound_functions(dll):
+    module = types.ModuleType("fake_al")
+    module.alFake = dll._functions["alFake"] = alFake
+    module.alOther = print
+    dll.set_profiling(True, [module])
+    assert dll.profiling and module.alFake is not alFake and module.alFake.__wrapped__ is alFake
+    assert module.alOther is print
+    module.alFake(1)
+    assert dll.call_stats["alFake"][0] == 1
+    # enabling twice does not wrap the wrapper
+    wrapper = module.alFake
+    dll.set_profiling(True, [module])
+    assert module.alFake is wrapper
+    dll.set_profiling(False, [module])
+    assert not dll.profiling and module.alFake is alFake
+
+
+class Target:
+    def work(self, value):
+        return value + 1
+
+    def fail(self):
+        raise RuntimeError("boom")
+
+
+def test_method_profiler(dll, caplog):
+    target = Target()
+    profiler = MethodProfiler(target, ["work", "fail"])
+    profiler.start()
+    assert target.work(1) == 2 and target.work(2) == 3
+    with pytest.raises(RuntimeError):
+        target.fail()
+    stats = profiler.stats()
+    assert stats["methods"]["work"]["calls"] == 2
+    assert sum(stats["methods"]["work"]["histogram_us"].values()) == 2
+    assert stats["methods"]["fail"]["calls"] == 1
+    assert set(stats) == {"methods", "openal", "context_switches"}
+    with caplog.at_level(logging.INFO):
+        profiler.dump()
+    assert "sound profile" in caplog.text
+    profiler.reset()
+    assert profiler.stats()["methods"] == {}
+    profiler.stop()
+    assert "work" not in vars(target)
+
+
+def test_sound_manager_only_undoes_its_own_al_profiling(dll):
+    sound_manager = SoundManager()
+    sound_manager.enable_profiling(openal_calls=True)
+    assert dll.profiling
+    sound_manager.stats()
+    sound_manager.disable_profiling()
+    assert not dll.profiling
+    with pytest.raises(ValueError):
+        sound_manager.stats()
+    # turned on elsewhere, e.g. with PYAL_PROFILE: left on by either kind of manager
+    openal.enable_profiling()
+    for openal_calls in (False, True):
+        sound_manager.enable_profiling(openal_calls=openal_calls)
+        sound_manager.disable_profiling()
+        assert dll.profiling
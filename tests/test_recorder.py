@@ -0,0 +1,49 @@
+import numpy as np
+
+from fighting_sound.openal import al
+from fighting_sound.utils.events import (EVENT_GAIN, EVENT_LISTENER_ORIENTATION, EVENT_PLAY, EVENT_PLAYBACK, EVENT_POSITION,
+                                         EVENT_STOP)
+from fighting_sound.utils.recorder import EventRecorder, load_recording
+
+
+class Handle:
+    pass
+
+
+def test_round_trip(tmp_path):
+    hit, kick, source, other = Handle(), Handle(), Handle(), Handle()
+    recorder = EventRecorder(tmp_path / "match.events", {"hit.wav": hit, "kick.wav": kick}, chunk_size=4, initial_capacity=1)
+    recorder.record_play(source, kick, 1.0, 2.0, 3.0, True)
+    recorder.advance(800)
+    recorder.record_play(other, hit, 0.0, 0.0, 0.0, False)
+    recorder.record_gain(source, 0.5)
+    for i in range(5):
+        recorder.advance(800)
+        recorder.record_position(other, float(i), 0.0, 0.0)
+    recorder.record_listener_orientation(0.0, 0.0, -1.0, 0.0, 1.0, 0.0)
+    recorder.record_playback(other, al.AL_FORMAT_MONO16, b"\x01\x02\x03\x04", 24000)
+    recorder.record_playback(other, al.AL_FORMAT_MONO16, b"\x05\x06", 24000)
+    recorder.record_stop(source)
+    recorder.close()
+
+    events, sound_names, samples, payload = load_recording(tmp_path / "match.events")
+    assert sound_names == ["kick.wav", "hit.wav"]
+    assert samples == 6 * 800
+    assert events["op"].tolist() == [EVENT_PLAY, EVENT_PLAY, EVENT_GAIN] + [EVENT_POSITION] * 5 + \
+        [EVENT_LISTENER_ORIENTATION, EVENT_PLAYBACK, EVENT_PLAYBACK, EVENT_STOP]
+    assert events["sample"].tolist() == [0, 800, 800, 1600, 2400, 3200, 4000, 4800, 4800, 4800, 4800, 4800]
+    assert events["source"][[0, 1, 2, 11]].tolist() == [0, 1, 0, 0]
+    assert events["buffer"][:2].tolist() == [0, 1] and events["flag"][:2].tolist() == [1, 0]
+    np.testing.assert_array_equal(events["values"][0], [1, 2, 3, 0, 0, 0])
+    np.testing.assert_array_equal(events["values"][7][:3], [4, 0, 0])
+    assert events["values"][2][0] == 0.5
+    playback = events[events["op"] == EVENT_PLAYBACK]
+    assert playback["buffer"].tolist() == [al.AL_FORMAT_MONO16] * 2 and playback["rate"].tolist() == [24000] * 2
+    assert [bytes(payload[offset:offset + length]) for offset, length in zip(playback["offset"], playback["length"])] == \
+        [b"\x01\x02\x03\x04", b"\x05\x06"]
+
+
+def test_empty_recording(tmp_path):
+    EventRecorder(tmp_path / "match.events").close()
+    events, sound_names, samples, payload = load_recording(tmp_path / "match.events")
+    assert len(events) == 0 and sound_names == [] and samples == 0 and len(payload) == 0
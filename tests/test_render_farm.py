@@ -0,0 +1,88 @@
+import queue
+
+import numpy as np
+import pytest
+
+from helpers import write_wave
+from fighting_sound.render_farm import RenderFarm, run_render_worker
+from fighting_sound.utils.audio_frame_ring import AudioFrameRing
+from fighting_sound.utils.bank import pack_sound_bank
+
+
+@pytest.fixture
+def ring():
+    ring = AudioFrameRing.create(2, (2 * 100, 2))
+    yield ring
+    ring.close()
+
+
+def run_worker(ring: AudioFrameRing, sounds, batches):
+    commands = queue.Queue()
+    results = queue.Queue()
+    for batch in batches + [None]:
+        commands.put(batch)
+    run_render_worker(ring.name, sounds, 100, 2, 48000, commands, results)
+    return [results.get_nowait() for _ in range(results.qsize())]
+
+
+def test_worker_renders_batches(tmp_path, ring, fake_openal):
+    write_wave(tmp_path / "hit.wav", np.full((150, 1), 16384, dtype=np.int16))
+    pack_sound_bank([tmp_path / "hit.wav"], tmp_path / "sounds.bank")
+    results = run_worker(ring, tmp_path / "sounds.bank", [
+        ([("create_source", 7), ("play", 7, "hit.wav", 0.0, 0.0, False)], 2),
+        ([("stop", 8)], 1),
+    ])
+    assert results[0] == (1, 2, None)
+    frames = ring.read(1)
+    np.testing.assert_array_equal(frames[:150], 0.5)
+    np.testing.assert_array_equal(frames[150:], 0.0)
+    seq, n_frames, error = results[1]
+    assert (seq, n_frames) == (2, 1) and "KeyError" in error
+    assert not fake_openal.devices
+
+
+def test_worker_answers_every_batch_after_a_failed_startup(tmp_path, ring, fake_openal):
+    results = run_worker(ring, tmp_path / "missing.bank", [([], 1), ([], 1)])
+    assert len(results) == 2
+    assert all(error.startswith("startup failed: FileNotFoundError") for _, _, error in results)
+    assert not fake_openal.devices
+
+
+def test_worker_without_a_ring_answers_with_the_error():
+    commands = queue.Queue()
+    results = queue.Queue()
+    commands.put(([], 1))
+    commands.put(None)
+    run_render_worker("fsrg_missing_ring", None, 100, 2, 48000, commands, results)
+    assert "FileNotFoundError" in results.get_nowait()[2]
+
+
+def test_farm_round_trip_with_a_failed_startup(tmp_path):
+    # no OpenAL or sound bank in the spawned worker: every batch comes back as an error through the real queues
+    farm = RenderFarm(1, tmp_path / "missing.bank", render_size=100)
+    try:
+        farm.submit(0, [], 1)
+        farm.submit(0, [("stop_all",)], 1)
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="startup failed") as excinfo:
+                farm.receive(0, timeout=60)
+            # the worker got as far as attaching the ring
+            assert farm.workers[0].ring.name not in str(excinfo.value)
+        assert farm.workers[0].pending == 0
+    finally:
+        process = farm.workers[0].process
+        farm.close()
+    assert process.exitcode == 0 and not farm.workers
+
+
+def test_receive_raises_when_the_worker_is_gone(tmp_path):
+    farm = RenderFarm(1, tmp_path / "missing.bank", render_size=100)
+    try:
+        process = farm.workers[0].process
+        process.terminate()
+        process.join()
+        farm.submit(0, [], 1)
+        with pytest.raises(RuntimeError, match="exited with code"):
+            farm.receive(0)
+    finally:
+        farm.close()
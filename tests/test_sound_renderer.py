@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+import pytest
+
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.openal import al
+from fighting_sound.sound_manager import SoundManager
+from fighting_sound.utils import openal as openal_utils
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED, LAYOUT_PLANAR, LAYOUT_PLANAR_CONTIGUOUS
+
+
+def test_close_renderer(fake_openal):
+    renderer = SoundRenderer.create_virtual_renderer()
+    renderer.create_source({})
+    renderer.close()
+    assert not fake_openal.devices and not fake_openal.contexts
+    assert openal_utils.current_context is None
+
+
+def test_close_thread_context_renderer(fake_openal):
+    renderer = SoundRenderer.create_virtual_renderer()
+    renderer.start_thread()
+    source_id = renderer.submit(renderer.create_source, {}).result()
+    renderer.submit(renderer.play, source_id).result()
+    assert fake_openal.calls.get("alcSetThreadContext")
+    renderer.close()
+    assert not openal_utils.thread_local_contexts
+    assert not fake_openal.contexts
+
+
+def test_close_sound_manager(fake_openal):
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer())
+    sound_manager.set_default_renderer(SoundRenderer.create_default_renderer())
+    sound_manager.enable_thread_local_contexts()
+    source = sound_manager.create_audio_source()
+    sound_manager.set_source_gain(source, 0.5)
+    sound_manager.close()
+    assert not fake_openal.devices
+
+
+def test_sound_manager_drives_renderer_threads_concurrently(fake_openal, monkeypatch):
+    sound_manager = SoundManager()
+    sound_manager.set_virtual_renderer(SoundRenderer.create_virtual_renderer())
+    sound_manager.set_default_renderer(SoundRenderer.create_default_renderer())
+    sound_manager.enable_thread_local_contexts(start_threads=True)
+    source = sound_manager.create_audio_source()
+    # both renderers have to be inside stop() at the same time to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    threads = []
+    stop = SoundRenderer.stop
+
+    def stop_together(renderer, source_id):
+        threads.append(threading.current_thread())
+        barrier.wait()
+        stop(renderer, source_id)
+
+    monkeypatch.setattr(SoundRenderer, "stop", stop_together)
+    sound_manager.stop(source)
+    monkeypatch.setattr(SoundRenderer, "stop", stop)
+    assert len(set(threads)) == 2 and threading.current_thread() not in threads
+    sound_manager.close()
+    assert not fake_openal.devices
+
+
+def play_tone(renderer: SoundRenderer) -> np.ndarray:
+    # a stereo ramp, so misordered channels or frames show up in the rendered samples
+    pcm = np.arange(-64, 64, dtype=np.int16).repeat(2).reshape(-1, 2) * 256
+    pcm[:, 1] = -pcm[:, 1]
+    buffer_id = renderer.create_buffer()
+    renderer.buffer_data([buffer_id], [(al.AL_FORMAT_STEREO16, pcm.tobytes(), pcm.nbytes, 48000)])
+    source_id = renderer.create_source({})
+    renderer.play2(source_id, buffer_id, 0, 0, 0, False)
+    return pcm.astype(np.float32) / 32768
+
+
+def test_render_into_interleaved_out(fake_openal):
+    renderer = SoundRenderer.create_virtual_renderer()
+    pcm = play_tone(renderer)
+    out = np.empty((100, 2), dtype=np.float32)
+    planar = renderer.sample_audio(al.ALfloat, 100, 2, out=out, layout=LAYOUT_PLANAR)
+    np.testing.assert_array_equal(out, pcm[:100])
+    np.testing.assert_array_equal(planar, pcm[:100].T)
+    renderer.close()
+
+
+def test_render_rejects_planar_out(fake_openal):
+    renderer = SoundRenderer.create_virtual_renderer()
+    with pytest.raises(ValueError):
+        renderer.sample_audio(al.ALfloat, 100, 2, out=np.empty((2, 100), dtype=np.float32), layout=LAYOUT_PLANAR)
+    with pytest.raises(ValueError):
+        renderer.sample_audio(al.ALfloat, 100, 2, out=np.empty(200, dtype=np.float32), layout=LAYOUT_INTERLEAVED)
+    out = np.empty((2, 100), dtype=np.float32)
+    play_tone(renderer)
+    assert renderer.sample_audio(al.ALfloat, 100, 2, out=out, layout=LAYOUT_PLANAR_CONTIGUOUS) is out
+    renderer.close()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from fighting_sound.models.sound_renderer import SoundRenderer
+from fighting_sound.models.source_bank import SourceBank
+from fighting_sound.openal import al
+
+
+def test_empty_bank(sound_manager):
+    bank = SourceBank(sound_manager, 0)
+    assert len(bank) == 0 and bank.source_ids.shape == (1, 0)
+    assert bank.commit() == 0
+
+
+def test_commit_pushes_only_changed_rows(sound_manager, fake_openal, monkeypatch):
+    bank = SourceBank(sound_manager, 4)
+    pushed = []
+    set_sources_attribute = SoundRenderer.set_sources_attribute
+
+    def record(renderer, source_ids, attr, values):
+        pushed.append((attr, source_ids.tolist()))
+        set_sources_attribute(renderer, source_ids, attr, values)
+
+    monkeypatch.setattr(SoundRenderer, "set_sources_attribute", record)
+    bank.set_positions([1, 3], [[1, 2, 3], [4, 5, 6]])
+    bank.set_gains(2, 0.5)
+    # unchanged values are not pushed
+    bank.set_pitches([0, 1], 1.0)
+    assert bank.commit() == 3
+    ids = bank.source_ids[0].tolist()
+    assert dict(pushed) == {al.AL_POSITION: [ids[1], ids[3]], al.AL_GAIN: [ids[2]], al.AL_PITCH: [], al.AL_LOOPING: []}
+    context = fake_openal.get_context()
+    assert context.sources[ids[3]].attributes[al.AL_POSITION] == (4.0, 5.0, 6.0)
+    assert context.sources[ids[2]].gain == 0.5
+    pushed.clear()
+    assert bank.commit() == 0
+    assert not pushed
+    np.testing.assert_array_equal(bank.committed_positions, bank.positions)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from fighting_sound.openal import al
+from fighting_sound.utils.layout import LAYOUT_INTERLEAVED
+
+
+def test_chunks_play_back_to_back(sound_manager):
+    source = sound_manager.create_audio_source()
+    chunks = [np.full((480, 2), i / 10, dtype=np.float32) for i in range(1, 4)]
+    for chunk in chunks:
+        assert sound_manager.playback(source, al.AL_FORMAT_STEREO_FLOAT32, chunk.tobytes(), 48000)
+    stream = sound_manager.get_streaming_source(source)
+    assert stream.get_queued_seconds() == pytest.approx(0.03)
+    audio = sound_manager.sample_audio(render_size=1440, layout=LAYOUT_INTERLEAVED)
+    np.testing.assert_array_equal(audio, np.concatenate(chunks))
+    assert stream.get_free_buffers() == stream.num_buffers
+    assert stream.stats()["underruns"] == 0
+
+
+def test_full_ring_drops_chunks(sound_manager):
+    source = sound_manager.create_audio_source()
+    chunk = np.zeros(480, dtype=np.int16).tobytes()
+    for _ in range(sound_manager.stream_buffers):
+        assert sound_manager.playback(source, al.AL_FORMAT_MONO16, chunk, 48000)
+    assert not sound_manager.playback(source, al.AL_FORMAT_MONO16, chunk, 48000)
+    assert sound_manager.get_streaming_source(source).dropped == 1
+    sound_manager.stop_playback(source)
+    assert sound_manager.get_streaming_source(source).get_free_buffers() == sound_manager.stream_buffers
+
+
+def test_unsupported_format_is_rejected(sound_manager):
+    source = sound_manager.create_audio_source()
+    with pytest.raises(ValueError, match="0x1300"):
+        sound_manager.playback(source, 0x1300, bytes(36), 48000)
@@ -0,0 +1,88 @@
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from helpers import ramp, write_wave
+from fighting_sound.openal import al
+from fighting_sound.utils.wave import MappedSound, PCMCache, list_sounds, parse_wave_header
+
+
+def wave_bytes(chunks) -> bytes:
+    body = b"".join(chunk_id + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1) for chunk_id, data in chunks)
+    return b"RIFF" + struct.pack("<I", 4 + len(body)) + b"WAVE" + body
+
+
+def fmt_chunk(channels: int, bits: int, sample_rate: int, audio_format: int = 1) -> bytes:
+    block_align = channels * bits // 8
+    return struct.pack("<HHIIHH", audio_format, channels, sample_rate, sample_rate * block_align, block_align, bits)
+
+
+def test_parse_wave_header_skips_other_chunks():
+    data = bytes(range(40))
+    buf = wave_bytes([(b"LIST", b"odd"), (b"fmt ", fmt_chunk(2, 16, 22050)), (b"data", data)])
+    channels, bits, sample_rate, offset, size = parse_wave_header(buf)
+    assert (channels, bits, sample_rate, size) == (2, 16, 22050, 40)
+    assert buf[offset:offset + size] == data
+
+
+def test_parse_wave_header_clamps_truncated_data():
+    buf = wave_bytes([(b"fmt ", fmt_chunk(1, 8, 8000)), (b"data", bytes(100))])[:-30]
+    assert parse_wave_header(buf)[4] == 70
+
+
+@pytest.mark.parametrize("buf", [
+    b"RIFX" + bytes(8),
+    wave_bytes([(b"data", bytes(4)), (b"fmt ", fmt_chunk(1, 16, 8000))]),
+    wave_bytes([(b"fmt ", fmt_chunk(1, 16, 8000))]),
+    wave_bytes([(b"fmt ", fmt_chunk(1, 32, 8000, audio_format=3)), (b"data", bytes(4))]),
+])
+def test_parse_wave_header_rejects_invalid_files(buf):
+    with pytest.raises(ValueError):
+        parse_wave_header(buf)
+
+
+def test_mapped_sound(tmp_path):
+    write_wave(tmp_path / "a.wav", ramp(50, 2), 32000)
+    with MappedSound(tmp_path / "a.wav") as sound:
+        assert (sound.alformat, sound.samplerate, sound.size) == (al.AL_FORMAT_STEREO16, 32000, 200)
+        np.testing.assert_array_equal(sound.data.view(np.int16).reshape(-1, 2), ramp(50, 2))
+
+
+def test_pcm_cache_evicts_least_recently_used(tmp_path):
+    paths = [write_wave(tmp_path / f"{i}.wav", ramp(100, 1, i), 48000) for i in range(3)]
+    cache = PCMCache(max_bytes=450)
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    assert cache.get(paths[0]) is first
+    cache.get(paths[2])
+    # 1 was used least recently and had to make room for 2
+    assert [os.path.basename(path) for path in cache.entries] == ["0.wav", "2.wav"]
+    assert cache.nbytes == 400
+    assert cache.get(paths[0]) is first
+
+
+def test_pcm_cache_reloads_changed_files(tmp_path):
+    path = write_wave(tmp_path / "a.wav", ramp(100), 48000)
+    cache = PCMCache()
+    first = cache.get(path)
+    write_wave(path, ramp(120), 48000)
+    os.utime(path, ns=(0, 0))
+    second = cache.get(path)
+    assert len(second[1]) == 240 and second is not first
+    assert cache.nbytes == 240
+
+
+def test_pcm_cache_skips_sounds_larger_than_the_cache(tmp_path):
+    path = write_wave(tmp_path / "a.wav", ramp(1000), 48000)
+    cache = PCMCache(max_bytes=100)
+    assert len(cache.get(path)[1]) == 2000
+    assert not cache.entries and cache.nbytes == 0
+
+
+def test_list_sounds_of_a_directory(tmp_path):
+    for name in ["b.WAV", "a.wav", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"")
+    assert [path.name for path in list_sounds(tmp_path)] == ["a.wav", "b.WAV"]
+    assert list_sounds([str(tmp_path / "x.wav")]) == [tmp_path / "x.wav"]